@@ -1,13 +1,35 @@
+import hashlib
+import os
+import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 
-from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtGui import QBrush, QColor, QPalette
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
                              QCheckBox, QLabel, QComboBox, QTabWidget, QDialog, QMessageBox, QSplitter, QHeaderView,
                              QGridLayout, QSpinBox, QDoubleSpinBox, QLineEdit, QGroupBox, QTextEdit, QScrollArea,
-                             QMenu, QAction, QFileDialog)
-from PyQt5.QtCore import Qt
+                             QMenu, QAction, QFileDialog, QTextBrowser,
+                             QStyledItemDelegate)
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+# 所有akshare请求复用同一个带连接池的Session，省掉每次调用的TCP+TLS握手
+# （akshare内部直接调requests.get/post，需在import akshare之前打补丁）
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+requests.get = _SESSION.get
+requests.post = _SESSION.post
+
 import akshare as ak
 import mplfinance as mpf
 from datetime import datetime, timedelta
@@ -16,35 +38,597 @@ from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
-class NumericTableWidgetItem(QTableWidgetItem):
-    def __lt__(self, other):
-        def parse_percentage(s):
-            s = s.strip().replace("%", "")
+# 设置matplotlib中文字体（模块导入时设置一次即可）
+plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']  # macOS
+# 如果是 Windows 系统，使用：
+# plt.rcParams['font.sans-serif'] = ['SimHei']
+plt.rcParams['axes.unicode_minus'] = False
+
+# K线图样式对象构建一次，重绘时直接复用
+_MARKET_COLORS = mpf.make_marketcolors(up='red', down='green',
+                                       edge='inherit',
+                                       wick='inherit',
+                                       volume='in')
+_MPF_STYLE = mpf.make_mpf_style(marketcolors=_MARKET_COLORS)
+
+
+# 非主板股票代码前缀：创业板(300)、科创板(688/689)、北交所(430/830/839)
+EXCLUDE_PREFIXES = ('300', '688', '430', '689', '830', '839')
+
+# 表格着色画刷构建一次，所有单元格共用，不再每格new QBrush(QColor(...))
+BRUSH_RED = QBrush(QColor('#FF4444'))
+BRUSH_GREEN = QBrush(QColor('#00AA00'))
+BRUSH_BLUE = QBrush(QColor('#0088FF'))
+BG_RED = QBrush(QColor('#FFEEEE'))
+BG_GREEN = QBrush(QColor('#EEFFEE'))
+
+# 建议文案 -> 颜色，按analyze_trading_signals产出的精确字符串查表，
+# 替代每个单元格做'买入' in str(...)这类子串扫描
+ADVICE_FG = {'建议买入': BRUSH_RED, '建议卖出': BRUSH_GREEN, '建议观望': BRUSH_BLUE}
+ADVICE_BG = {'建议买入': BG_RED, '建议卖出': BG_GREEN}
+
+# 综合评级 -> (前景色, 背景色)，替代涨停分析表里每格的if-elif判断
+BRUSH_PURE_RED = QBrush(QColor('#FF0000'))
+BRUSH_WHITE = QBrush(QColor('#FFFFFF'))
+BG_STRONG_RED = QBrush(QColor('#FF4444'))
+RATING_COLORS = {
+    '强烈推荐': (BRUSH_PURE_RED, BG_RED),
+    '建议关注': (BRUSH_RED, None),
+    '强烈风险': (BRUSH_WHITE, BG_STRONG_RED),
+    '注意风险': (BRUSH_PURE_RED, None),
+}
+
+
+# 历史行情磁盘缓存：跨按钮操作、跨程序重启复用，TTL内不再发HTTP请求
+_HIST_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.stock_screener_cache')
+_HIST_CACHE_TTL = 4 * 3600  # 秒
+
+
+def _hist_cache_path(stock_code, period, start_date, end_date):
+    key = hashlib.sha256(f"{stock_code}|{period}|{start_date}|{end_date}".encode()).hexdigest()
+    return os.path.join(_HIST_CACHE_DIR, f"{key}.pkl")
+
+
+@lru_cache(maxsize=256)
+def _fetch_hist_raw(stock_code, period, start_date, end_date):
+    """按(代码, 周期, 起止日期)两级缓存历史行情：进程内lru_cache + 磁盘pickle
+
+    磁盘层让重复的筛选/分析操作（60/120/30/5天窗口高度重叠）在TTL内
+    完全不走网络，读一个pickle只要几毫秒。
+    """
+    path = _hist_cache_path(stock_code, period, start_date, end_date)
+    try:
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < _HIST_CACHE_TTL:
+            return pd.read_pickle(path)
+    except Exception as e:
+        print(f"读取历史行情缓存失败: {e}")
+
+    df = ak.stock_zh_a_hist(
+        symbol=stock_code,
+        period=period,
+        start_date=start_date,
+        end_date=end_date
+    )
+    try:
+        os.makedirs(_HIST_CACHE_DIR, exist_ok=True)
+        df.to_pickle(path)
+    except Exception as e:
+        print(f"写入历史行情缓存失败: {e}")
+    return df
+
+
+def fetch_hist(stock_code, period, start_date, end_date):
+    """获取历史行情数据（带缓存），返回副本避免调用方修改缓存内容"""
+    return _fetch_hist_raw(stock_code, period, start_date, end_date).copy()
+
+
+def _cached_ak(fn_name, ttl, **kwargs):
+    """akshare接口的磁盘TTL缓存：按函数名+参数落盘，TTL内不再发HTTP请求
+
+    给弹窗里的排行/资金流抓取用，与历史行情缓存共用目录和pickle格式。
+    """
+    key = hashlib.sha256(f"{fn_name}|{sorted(kwargs.items())}".encode()).hexdigest()
+    path = os.path.join(_HIST_CACHE_DIR, f"ak_{key}.pkl")
+    try:
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+            return pd.read_pickle(path)
+    except Exception as e:
+        print(f"读取{fn_name}缓存失败: {e}")
+
+    df = getattr(ak, fn_name)(**kwargs)
+    try:
+        os.makedirs(_HIST_CACHE_DIR, exist_ok=True)
+        df.to_pickle(path)
+    except Exception as e:
+        print(f"写入{fn_name}缓存失败: {e}")
+    return df
+
+
+# 资金净流入排序弹窗的三套数据源：时间范围 -> (抓取函数, 列名映射)
+_FLOW_SCHEMAS = {
+    "当日": (
+        lambda: _cached_ak('stock_fund_flow_individual', 60),
+        {
+            'code': '股票代码',
+            'name': '股票简称',
+            'price': '最新价',
+            'change_percent': '涨跌幅',
+            'main_net_inflow': '净额',
+            'super_net_inflow': '流入资金',
+            'big_net_inflow': '流出资金',
+            'medium_net_inflow': '成交额'
+        }
+    ),
+    "5日": (
+        # 5日榜单变化慢，缓存1小时
+        lambda: _cached_ak('stock_individual_fund_flow_rank', 3600),
+        {
+            'code': '代码',
+            'name': '名称',
+            'price': '最新价',
+            'change_percent': '5日涨跌幅',
+            'main_net_inflow': '5日主力净流入-净额',
+            'super_net_inflow': '5日超大单净流入-净额',
+            'big_net_inflow': '5日大单净流入-净额',
+            'medium_net_inflow': '5日中单净流入-净额'
+        }
+    ),
+    "东方财富当日": (
+        lambda: _cached_ak('stock_individual_fund_flow_rank', 60,
+                           indicator="今日"),
+        {
+            'code': '代码',
+            'name': '名称',
+            'price': '最新价',
+            'change_percent': '今日涨跌幅',
+            'main_net_inflow': '今日主力净流入-净额',
+            'super_net_inflow': '今日超大单净流入-净额',
+            'big_net_inflow': '今日大单净流入-净额',
+            'medium_net_inflow': '今日中单净流入-净额'
+        }
+    ),
+}
+
+
+def _postprocess_spot(df):
+    """压缩行情快照的内存占用：float64降为float32，代码/名称转category
+
+    快照约5000行×几十列，降位后过滤/排序扫过的字节数大约减半。
+    """
+    num_cols = df.select_dtypes('float64').columns
+    if len(num_cols):
+        df[num_cols] = df[num_cols].astype('float32')
+    for col in ('代码', '名称'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _ema_af(x, alpha):
+    """EMA递推，等价于pandas ewm(..., adjust=False).mean()
+
+    跳过头部NaN（如rolling窗口不足产生的空值），从第一个有效值开始递推。
+    """
+    out = np.empty(x.size)
+    c = 1.0 - alpha
+    state = np.nan
+    for i in range(x.size):
+        v = x[i]
+        if np.isnan(v):
+            out[i] = state
+        else:
+            state = v if np.isnan(state) else alpha * v + c * state
+            out[i] = state
+    return out
+
+
+def _macd_arrays(close):
+    """基于_ema_af内核计算MACD，返回(macd, signal, histogram)三个numpy数组
+
+    span换算alpha = 2/(span+1)，与pandas ewm(span=N, adjust=False)等价。
+    """
+    macd = _ema_af(close, 2.0 / (12 + 1)) - _ema_af(close, 2.0 / (26 + 1))
+    signal = _ema_af(macd, 2.0 / (9 + 1))
+    return macd, signal, macd - signal
+
+
+class _WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+
+class FetchRunnable(QRunnable):
+    """在线程池中执行阻塞的数据抓取，结果通过信号回传主线程"""
+
+    def __init__(self, fetch_fn):
+        super().__init__()
+        self.fetch_fn = fetch_fn
+        self.signals = _WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fetch_fn()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+# 持有正在执行的worker引用，防止信号送达前被垃圾回收
+_ACTIVE_WORKERS = set()
+
+
+def run_async(fetch_fn, on_done, on_error=None):
+    """把fetch_fn丢到全局线程池执行，完成后在主线程回调on_done(result)
+
+    网络请求不再阻塞Qt事件循环；绘图等界面操作仍留在主线程完成。
+    """
+    worker = FetchRunnable(fetch_fn)
+    _ACTIVE_WORKERS.add(worker)
+
+    def _cleanup(*_):
+        _ACTIVE_WORKERS.discard(worker)
+
+    worker.signals.finished.connect(on_done)
+    worker.signals.finished.connect(_cleanup)
+    if on_error is not None:
+        worker.signals.error.connect(on_error)
+    worker.signals.error.connect(_cleanup)
+    QThreadPool.globalInstance().start(worker)
+
+
+def _parallel_map_codes(eval_fn, codes, max_workers=16):
+    """线程池并发执行eval_fn(code)，返回{code: 结果}
+
+    逐股历史行情抓取是纯网络I/O，串行时耗时被HTTP往返主导，
+    并发后总耗时约等于最慢一次请求。单只股票失败只打印，不影响其余。
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(eval_fn, code): code for code in codes}
+        for fut in as_completed(futures):
+            code = futures[fut]
             try:
-                return float(s) / 100
-            except ValueError:
-                return float('-inf')
+                results[code] = fut.result()
+            except Exception as e:
+                print(f"处理股票 {code} 时出错: {e}")
+    return results
+
+
+def _sma_series(arr, w):
+    """整条w日简单均线（前w-1个为NaN），cumsum一次算完"""
+    n = arr.size
+    out = np.full(n, np.nan)
+    if n >= w:
+        cs = np.concatenate(([0.0], np.cumsum(arr)))
+        out[w - 1:] = (cs[w:] - cs[:-w]) / w
+    return out
+
+
+def _parse_flow_series(s, keep_nan=False):
+    """把带'亿'/'万'后缀的资金字符串列一次性解析成浮点numpy数组（单位：元）
+
+    接口返回的资金列有时是'1.23亿'/'4,560万'这种文本，整列用.str
+    向量化处理，替代逐行逐单元格的Python字符串判断。
+    keep_nan=True时解析失败的值保留NaN，调用方可据此整体剔除坏行。
+    """
+    v = s.astype(str).str.replace(',', '', regex=False)
+    mult = np.where(v.str.contains('亿', regex=False), 1e8,
+                    np.where(v.str.contains('万', regex=False), 1e4, 1.0))
+    num = pd.to_numeric(
+        v.str.replace('亿', '', regex=False).str.replace('万', '', regex=False),
+        errors='coerce')
+    if not keep_nan:
+        num = num.fillna(0.0)
+    return num.to_numpy(np.float64) * mult
+
+
+def _partition_flows(abs_flow):
+    """按主力净流入绝对值分成5000万/1000万/100万三档，返回档内降序下标
+
+    digitize一次完成全部阈值比较，argsort只在各档内部做，
+    档位顺序与弹窗展示一致：5000万以上、1000万-5000万、100万-1000万。
+    """
+    levels = np.digitize(abs_flow, [1000000, 10000000, 50000000])
+    out = []
+    for level in (3, 2, 1):
+        idx = np.nonzero(levels == level)[0]
+        # 空档或只有一只股票时顺序已定，跳过argsort
+        if idx.size > 1:
+            idx = idx[np.argsort(-abs_flow[idx], kind='stable')]
+        out.append(idx)
+    return out
+
+
+def _compute_indicators(close, high=None, low=None):
+    """对同一条收盘价一次算出MA/RSI/MACD（传入高低价时附带KDJ）
+
+    返回numpy数组字典：ma5/ma10/ma20/rsi/macd/signal/histogram[/k/d]。
+    各指标共用同一份价格数组和差分，替代分散的rolling/ewm逐个扫描。
+    """
+    # 三条均线共用同一份cumsum，不再各自扫一遍收盘价
+    n = close.size
+    cs = np.concatenate(([0.0], np.cumsum(close)))
+    out = {}
+    for name, w in (('ma5', 5), ('ma10', 10), ('ma20', 20)):
+        ma = np.full(n, np.nan)
+        if n >= w:
+            ma[w - 1:] = (cs[w:] - cs[:-w]) / w
+        out[name] = ma
+
+    # RSI（14日简单均值口径，与原rolling(14).mean()一致）
+    delta = np.diff(close, prepend=close[:1])
+    gain = _sma_series(np.where(delta > 0, delta, 0.0), 14)
+    loss = _sma_series(np.where(delta < 0, -delta, 0.0), 14)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['rsi'] = 100.0 - 100.0 / (1.0 + gain / loss)
+
+    out['macd'], out['signal'], out['histogram'] = _macd_arrays(close)
+
+    if high is not None and low is not None and close.size >= 9:
+        low9 = sliding_window_view(low, 9).min(axis=1)
+        high9 = sliding_window_view(high, 9).max(axis=1)
+        pad = np.full(8, np.nan)
+        low9 = np.concatenate((pad, low9))
+        high9 = np.concatenate((pad, high9))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsv = (close - low9) / (high9 - low9) * 100.0
+        out['k'] = _ema_af(rsv, 1.0 / 3)
+        out['d'] = _ema_af(out['k'], 1.0 / 3)
+
+    return out
+
+
+def _ma_signals(close, lookback=3):
+    """纯numpy计算均线拐头/多头信号，返回(is_turning_up, is_bullish)
+
+    cumsum一次得到全部均线，再只取尾部lookback+1个点算斜率，
+    等价于原先MA5/10/20/30各做一遍rolling+diff+iloc标量抽取。
+    """
+    n = close.size
+    # 拐头只看MA5/10/20，20+lookback根就能判；多头排列另需MA30
+    if n < 20 + lookback:
+        return False, False
+
+    cs = np.concatenate(([0.0], np.cumsum(close)))
+
+    def ma_tail(w, k):
+        # 最后k个MA(w)值
+        idx = np.arange(n - k, n)
+        return (cs[idx + 1] - cs[idx + 1 - w]) / w
+
+    # 先只算MA5：拐头和多头都要求MA5最近一天向上，不满足就直接出局，
+    # 大多数股票在这里返回，省掉其余三条均线的尾部计算
+    ma5_tail = ma_tail(5, lookback + 1)
+    ma5_slopes = np.diff(ma5_tail)
+    if ma5_slopes[-1] <= 0:
+        return False, False
+
+    last_ma = {5: ma5_tail[-1]}
+    last_slope = {5: ma5_slopes[-1]}
+    prev_slope_mean = {5: ma5_slopes[:-1].mean()}
+    for w in (10, 20):
+        tail = ma_tail(w, lookback + 1)
+        slopes = np.diff(tail)
+        last_ma[w] = tail[-1]
+        last_slope[w] = slopes[-1]
+        prev_slope_mean[w] = slopes[:-1].mean()
+
+    # 拐头向上：最近一天斜率转正，之前趋势向下或走平
+    is_turning_up = all(
+        last_slope[w] > 0 and prev_slope_mean[w] <= 0
+        for w in (5, 10, 20)
+    )
+
+    # 多头排列还要MA30，历史不足30+lookback根时只可能判出拐头
+    has_ma30 = n >= 30 + lookback
+    if has_ma30:
+        tail = ma_tail(30, lookback + 1)
+        slopes = np.diff(tail)
+        last_ma[30] = tail[-1]
+        last_slope[30] = slopes[-1]
+
+    # 多头排列：均线从短到长依次向下排列，且斜率都为正
+    is_bullish = (
+        has_ma30 and
+        last_ma[5] > last_ma[10] > last_ma[20] > last_ma[30] and
+        all(last_slope[w] > 0 for w in (5, 10, 20, 30))
+    )
+
+    return is_turning_up, is_bullish
+
+
+def _wilder_rsi(gain, loss, n):
+    """Wilder平滑RSI：即alpha=1/n的EMA递推，复用_ema_af内核
+
+    gain/loss由调用方预先算好，可供多个周期复用；avg_loss为0时RSI取100。
+    """
+    avg_gain = _ema_af(gain, 1.0 / n)
+    avg_loss = _ema_af(loss, 1.0 / n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+
+# 涨停票评级规则表：(判断, 评分增量, 风险分增量, 理由)。
+# 谓词按原if/elif链的语义写成互斥条件，整条梯子退化为一次表扫描
+_RATING_RULES = (
+    # 1. 连续涨停（三板以上同时加风险分）
+    (lambda c: c['limit_up_count'] >= 3, 2, 1, "连续三板以上"),
+    (lambda c: c['limit_up_count'] == 2, 1, 0, "连续两板"),
+    # 2. 量能
+    (lambda c: c['volume_ratio'] > 3, 2, 0, "量能显著放大"),
+    (lambda c: not c['volume_ratio'] > 3 and c['volume_ratio'] > 2, 1, 0, "量能良好"),
+    (lambda c: c['volume_ratio'] < 0.8, 0, 1, "量能不足"),
+    # 3. 均线系统
+    (lambda c: c['bull_stack'] and c['ma5_slope'] > 2, 2, 0, "均线系统强势"),
+    (lambda c: c['bull_stack'] and not c['ma5_slope'] > 2, 1, 0, "均线系统向好"),
+    (lambda c: not c['bull_stack'] and c['bear_stack'], 0, 1, "均线系统弱势"),
+    # 4. RSI
+    (lambda c: 50 < c['rsi_last'] < 70, 1, 0, "RSI健康"),
+    (lambda c: c['rsi_last'] > 80, 0, 2, "RSI超买"),
+    (lambda c: c['rsi_last'] < 30, 0, 1, "RSI超卖"),
+    # 5. MACD
+    (lambda c: c['macd_golden'], 2, 0, "MACD金叉"),
+    (lambda c: not c['macd_golden'] and c['macd_strong'], 1, 0, "MACD强势"),
+    (lambda c: not c['macd_golden'] and not c['macd_strong'] and c['macd_dead'], 0, 1, "MACD死叉"),
+    # 6. 行业资金（1亿以上/以下加重）
+    (lambda c: c['flow_value'] is not None and c['flow_value'] > 100000000, 2, 0, "行业资金大幅流入"),
+    (lambda c: c['flow_value'] is not None and not c['flow_value'] > 100000000
+        and c['flow_value'] > 0, 1, 0, "行业资金净流入"),
+    (lambda c: c['flow_value'] is not None and c['flow_value'] < -100000000, 0, 2, "行业资金大幅流出"),
+    (lambda c: c['flow_value'] is not None and not c['flow_value'] < -100000000
+        and c['flow_value'] < 0, 0, 1, "行业资金净流出"),
+    # 7. 价格位置
+    (lambda c: c['current_position'] < 30, 2, 0, "低位突破"),
+    (lambda c: c['current_position'] > 70, 0, 2, "高位风险"),
+    # 8. 成交量
+    (lambda c: c['vol_last'] > c['vol_mean'] * 3, 2, 0, "成交量显著放大"),
+    (lambda c: not c['vol_last'] > c['vol_mean'] * 3
+        and c['vol_last'] > c['vol_mean'] * 2, 1, 0, "成交量放大"),
+    (lambda c: c['vol_last'] < c['vol_mean'] * 0.5, 0, 1, "成交量萎缩"),
+    # 9. 换手率
+    (lambda c: c['turnover'] > 15, 2, 0, "换手充分"),
+    (lambda c: not c['turnover'] > 15 and c['turnover'] > 10, 1, 0, "换手活跃"),
+    (lambda c: c['turnover'] < 3, 0, 1, "换手不足"),
+)
+
+
+# 趋势得分对应的文案，预测函数只返回下标
+TREND_LABELS = ("强势上涨", "震荡上涨", "震荡整理", "可能回调")
+
+
+def _predict_trend_idx(ma5_last, ma10_last, ma20_last, rsi_last,
+                       macd_last, signal_last, vol_last, vol_mean):
+    """趋势预测打分，输入为调用方已解包好的标量，返回TREND_LABELS下标"""
+    trend_score = 0
+
+    # 1. 均线系统得分
+    if ma5_last > ma10_last > ma20_last:
+        trend_score += 2
+    elif ma5_last > ma10_last:
+        trend_score += 1
+
+    # 2. RSI得分
+    if 30 <= rsi_last <= 70:
+        trend_score += 1
+    elif rsi_last > 70:
+        trend_score -= 1
+
+    # 3. MACD得分
+    if macd_last > signal_last:
+        trend_score += 1
+    elif macd_last < signal_last:
+        trend_score -= 1
+
+    # 4. 量能得分
+    if vol_last > vol_mean:
+        trend_score += 1
+
+    # 根据得分预测趋势
+    if trend_score >= 3:
+        return 0
+    if trend_score >= 1:
+        return 1
+    if trend_score >= -1:
+        return 2
+    return 3
+
+
+def _score_limit_up_stock(limit_up_count, volume_ratio, turnover,
+                          bull_stack, bear_stack, ma5_slope, rsi_last,
+                          macd_golden, macd_strong, macd_dead,
+                          flow_value, current_position, vol_last, vol_mean):
+    """涨停票综合评级打分，输入全部为预先算好的标量
+
+    规则集中在_RATING_RULES表里维护，这里只扫一遍表累加。
+    返回(评分, 风险分, 评级理由列表)。
+    """
+    ctx = {
+        'limit_up_count': limit_up_count,
+        'volume_ratio': volume_ratio,
+        'turnover': turnover,
+        'bull_stack': bull_stack,
+        'bear_stack': bear_stack,
+        'ma5_slope': ma5_slope,
+        'rsi_last': rsi_last,
+        'macd_golden': macd_golden,
+        'macd_strong': macd_strong,
+        'macd_dead': macd_dead,
+        'flow_value': flow_value,
+        'current_position': current_position,
+        'vol_last': vol_last,
+        'vol_mean': vol_mean,
+    }
+    rating_score = 0
+    risk_score = 0
+    rating_reasons = []
+    for pred, score_add, risk_add, label in _RATING_RULES:
+        if pred(ctx):
+            rating_score += score_add
+            risk_score += risk_add
+            rating_reasons.append(label)
+    return rating_score, risk_score, rating_reasons
 
+
+class NumericTableWidgetItem(QTableWidgetItem):
+    """构造时预解析数值，排序比较直接比浮点数，避免每次比较重新解析文本"""
+
+    def __init__(self, text='', value=None):
+        super().__init__(text)
+        if value is not None:
+            # 调用方已持有数值时直接使用，省去文本解析
+            try:
+                self._val = float(value)
+            except (TypeError, ValueError):
+                self._val = self._parse(text)
+        else:
+            self._val = self._parse(text)
+
+    @staticmethod
+    def _parse(s):
+        s = str(s).strip()
+        is_pct = '%' in s
+        if is_pct:
+            s = s.replace('%', '')
         try:
-            if "%" in self.text() and "%" in other.text():
-                return parse_percentage(self.text()) < parse_percentage(other.text())
-            return float(self.text()) < float(other.text())
+            val = float(s)
         except ValueError:
-            return super().__lt__(other)
+            return float('-inf')
+        return val / 100 if is_pct else val
+
+    def __lt__(self, other):
+        if isinstance(other, NumericTableWidgetItem):
+            return self._val < other._val
+        return super().__lt__(other)
+
+
+class FlowColorDelegate(QStyledItemDelegate):
+    """按单元格数值正负着色的绘制代理：正红负绿，非数值不变色
+
+    颜色在绘制可见单元格时才决定，填表循环不再给每个item挂前景画刷。
+    """
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        try:
+            value = float(str(index.data(Qt.DisplayRole)).rstrip('%'))
+        except (TypeError, ValueError):
+            return
+        if value > 0:
+            option.palette.setColor(QPalette.Text, BRUSH_RED.color())
+        elif value < 0:
+            option.palette.setColor(QPalette.Text, BRUSH_GREEN.color())
 
 
 class ChartWindow(QDialog):
     def __init__(self, stock_code):
         super().__init__()
         self.stock_code = stock_code
+        self._daily_cache = {}  # 对话框生命周期内复用的日线数据
         self.initUI()
 
     def initUI(self):
-        # 设置matplotlib中文字体
-        plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']  # macOS
-        # 如果是 Windows 系统，使用：
-        # plt.rcParams['font.sans-serif'] = ['SimHei']
-        plt.rcParams['axes.unicode_minus'] = False
         self.setWindowTitle(f'股票图表 - {self.stock_code}')
         self.setGeometry(300, 300, 800, 600)
 
@@ -77,53 +661,59 @@ class ChartWindow(QDialog):
             self.plot_kdj()
         elif chart_type == 'RSI':
             self.plot_rsi()
-        self.canvas.draw()
+        # draw_idle合并连续的重绘请求，快速切换图表类型时只做一次完整渲染
+        self.canvas.draw_idle()
 
     def plot_timeline(self):
+        # 获取分时数据（在线程池中抓取，不阻塞界面）
+        today = datetime.now().strftime('%Y%m%d')
+        run_async(
+            lambda: ak.stock_zh_a_hist_min_em(
+                symbol=self.stock_code,
+                period='1',
+                start_date=today,
+                end_date=today
+            ),
+            self._render_timeline,
+            lambda msg: print(f"Failed to plot timeline: {msg}")
+        )
+
+    def _render_timeline(self, df):
         try:
             # 清除当前图形
             self.figure.clear()
 
-            # 获取分时数据
-            df = ak.stock_zh_a_hist_min_em(
-                symbol=self.stock_code,
-                period='1',
-                start_date=(datetime.now()).strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d')
-            )
-
             # 检查数据是否为空
             if df.empty:
                 print("没有获取到数据")
                 return
 
-            # 打印数据，用于调试
-            print("收盘价范围:", df['收盘'].min(), "-", df['收盘'].max())
-            print("成交量范围:", df['成交量'].min(), "-", df['成交量'].max())
-
-            # 准备数据
-            df['时间'] = pd.to_datetime(df['时间'])
-            df.set_index('时间', inplace=True)
+            # 准备数据（指定时间格式走C解析器，直接取numpy数组，不构建DatetimeIndex）
+            times = pd.to_datetime(df['时间'], format='%Y-%m-%d %H:%M:%S', cache=True).to_numpy()
+            prices = df['收盘'].to_numpy(dtype=np.float64)
+            volumes = df['成交量'].to_numpy(dtype=np.float64)
 
-            # 检查处理后的数据
-            print("数据点数量:", len(df))
+            # 打印数据，用于调试
+            print("收盘价范围:", prices.min(), "-", prices.max())
+            print("成交量范围:", volumes.min(), "-", volumes.max())
+            print("数据点数量:", len(times))
 
             # 创建子图
             ax1 = self.figure.add_subplot(111)
 
             # 绘制分时价格并返回线条对象
-            line1 = ax1.plot(df.index, df['收盘'], 'b-', label='Price')
+            line1 = ax1.plot(times, prices, 'b-', label='Price')
             print("是否创建了价格线:", len(line1) > 0)
 
             # 创建成交量子图
             ax2 = ax1.twinx()
-            bars = ax2.bar(df.index, df['成交量'], alpha=0.3, color='g', label='Volume')
+            bars = ax2.bar(times, volumes, alpha=0.3, color='g', label='Volume')
             print("是否创建了成交量柱:", len(bars) > 0)
 
             # 设置坐标轴范围
-            ax1.set_xlim(df.index.min(), df.index.max())
-            y_margin = (df['收盘'].max() - df['收盘'].min()) * 0.1
-            ax1.set_ylim(df['收盘'].min() - y_margin, df['收盘'].max() + y_margin)
+            ax1.set_xlim(times.min(), times.max())
+            y_margin = (prices.max() - prices.min()) * 0.1
+            ax1.set_ylim(prices.min() - y_margin, prices.max() + y_margin)
 
             # 设置标题和标签
             ax1.set_title(f'{self.stock_code} Timeline')
@@ -148,7 +738,7 @@ class ChartWindow(QDialog):
             ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
 
             # 刷新画布
-            self.canvas.draw()
+            self.canvas.draw_idle()
 
         except Exception as e:
             print(f"Failed to plot timeline: {e}")
@@ -156,22 +746,60 @@ class ChartWindow(QDialog):
             traceback.print_exc()
 
     def plot_macd(self):
+        self._fetch_daily(120, self._render_macd, 'MACD')
+
+    def _fetch_daily(self, days, on_done, chart_type):
+        """在线程池中抓取日线数据，完成后回调绘图函数
+
+        整个窗口只抓一次120天数据并缓存，较短窗口（如K线图的60天）
+        直接按日期切片复用，切换图表类型时不再重复请求。
+        首次抓取在路上时再切换图表类型只更新待画的回调，不重复发请求，
+        抓完只渲染当前选中的图，旧请求不会覆盖用户刚切到的图。
+        """
+        cached = self._daily_cache.get('daily')
+        if cached is not None:
+            on_done(self._slice_days(cached, days))
+            return
+
+        if 'pending' in self._daily_cache:
+            self._daily_cache['pending'] = (days, on_done, chart_type)
+            return
+        self._daily_cache['pending'] = (days, on_done, chart_type)
+
+        start_date = (datetime.now() - timedelta(days=120)).strftime('%Y%m%d')
+        end_date = datetime.now().strftime('%Y%m%d')
+
+        def _store_and_render(df):
+            self._daily_cache['daily'] = df
+            p_days, p_on_done, p_chart_type = self._daily_cache.pop('pending')
+            if self.chart_type.currentText() == p_chart_type:
+                p_on_done(self._slice_days(df, p_days))
+
+        def _on_error(msg):
+            self._daily_cache.pop('pending', None)
+            print(f"获取日线数据失败: {msg}")
+
+        run_async(
+            lambda: fetch_hist(self.stock_code, "daily", start_date, end_date),
+            _store_and_render,
+            _on_error
+        )
+
+    @staticmethod
+    def _slice_days(df, days):
+        """从120天缓存中切出最近days个自然日的数据"""
+        if days >= 120 or df.empty:
+            return df
+        cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        return df[df['日期'].astype(str) >= cutoff]
+
+    def _render_macd(self, df):
         try:
-            # 获取数据
-            df = ak.stock_zh_a_hist(
-                symbol=self.stock_code,
-                period="daily",
-                start_date=(datetime.now() - timedelta(days=120)).strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d')
-            )
+            self.figure.clear()
 
-            # 计算MACD
-            close = df['收盘'].astype(float)
-            exp1 = close.ewm(span=12, adjust=False).mean()
-            exp2 = close.ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-            histogram = macd - signal
+            # 计算MACD（单次numpy遍历，替代三次pandas ewm）
+            close = df['收盘'].to_numpy(dtype=np.float64)
+            macd, signal, histogram = _macd_arrays(close)
 
             # 创建子图
             gs = self.figure.add_gridspec(2, 1, height_ratios=[2, 1])
@@ -186,12 +814,10 @@ class ChartWindow(QDialog):
             ax2.plot(dates, macd, label='MACD')
             ax2.plot(dates, signal, label='Signal')
 
-            # 绘制直方图
-            for i in range(len(dates)):
-                if histogram[i] >= 0:
-                    ax2.bar(dates[i], histogram[i], color='r', width=0.8)
-                else:
-                    ax2.bar(dates[i], histogram[i], color='g', width=0.8)
+            # 绘制直方图（按正负一次性分组绘制，避免逐根bar产生大量artist）
+            pos = histogram >= 0
+            ax2.bar(dates[pos], histogram[pos], color='r', width=0.8)
+            ax2.bar(dates[~pos], histogram[~pos], color='g', width=0.8)
 
             # 设置标题和图例
             ax1.set_title(f'{self.stock_code} MACD分析')
@@ -202,28 +828,37 @@ class ChartWindow(QDialog):
             ax1.tick_params(axis='x', rotation=45)
             ax2.tick_params(axis='x', rotation=45)
 
+            self.canvas.draw_idle()
+
         except Exception as e:
             print(f"绘制MACD失败: {e}")
             import traceback
             traceback.print_exc()
 
     def plot_kdj(self):
+        self._fetch_daily(120, self._render_kdj, 'KDJ')
+
+    def _render_kdj(self, df):
         try:
-            # 获取数据
-            df = ak.stock_zh_a_hist(
-                symbol=self.stock_code,
-                period="daily",
-                start_date=(datetime.now() - timedelta(days=120)).strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d')
-            )
+            self.figure.clear()
+
+            if len(df) < 9:
+                print("数据不足9天，无法计算KDJ")
+                return
+
+            # 计算KDJ（滑动窗口视图求9日高低点，替代pandas rolling）
+            low = df['最低'].to_numpy(dtype=np.float64)
+            high = df['最高'].to_numpy(dtype=np.float64)
+            close = df['收盘'].to_numpy(dtype=np.float64)
 
-            # 计算KDJ
-            low_list = df['最低'].rolling(window=9, min_periods=9).min()
-            high_list = df['最高'].rolling(window=9, min_periods=9).max()
-            rsv = (df['收盘'] - low_list) / (high_list - low_list) * 100
+            pad = np.full(8, np.nan)
+            low_list = np.concatenate([pad, sliding_window_view(low, 9).min(axis=1)])
+            high_list = np.concatenate([pad, sliding_window_view(high, 9).max(axis=1)])
+            rsv = (close - low_list) / (high_list - low_list) * 100
 
-            k = rsv.ewm(com=2, adjust=False).mean()
-            d = k.ewm(com=2, adjust=False).mean()
+            # com=2 等价于 alpha=1/3
+            k = _ema_af(rsv, 1.0 / 3.0)
+            d = _ema_af(k, 1.0 / 3.0)
             j = 3 * k - 2 * d
 
             # 创建子图
@@ -248,32 +883,29 @@ class ChartWindow(QDialog):
             ax1.tick_params(axis='x', rotation=45)
             ax2.tick_params(axis='x', rotation=45)
 
+            self.canvas.draw_idle()
+
         except Exception as e:
             print(f"绘制KDJ失败: {e}")
             import traceback
             traceback.print_exc()
 
     def plot_rsi(self):
+        self._fetch_daily(120, self._render_rsi, 'RSI')
+
+    def _render_rsi(self, df):
         try:
-            # 获取数据
-            df = ak.stock_zh_a_hist(
-                symbol=self.stock_code,
-                period="daily",
-                start_date=(datetime.now() - timedelta(days=120)).strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d')
-            )
+            self.figure.clear()
 
-            # 计算RSI
-            def calculate_rsi(data, periods=14):
-                delta = data.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
-                rs = gain / loss
-                return 100 - (100 / (1 + rs))
+            # 计算RSI（Wilder平滑递推，gain/loss只算一次供三个周期复用）
+            close = df['收盘'].to_numpy(dtype=np.float64)
+            delta = np.diff(close, prepend=close[0])
+            gain = np.maximum(delta, 0.0)
+            loss = np.maximum(-delta, 0.0)
 
-            rsi_6 = calculate_rsi(df['收盘'].astype(float), 6)
-            rsi_12 = calculate_rsi(df['收盘'].astype(float), 12)
-            rsi_24 = calculate_rsi(df['收盘'].astype(float), 24)
+            rsi_6 = _wilder_rsi(gain, loss, 6)
+            rsi_12 = _wilder_rsi(gain, loss, 12)
+            rsi_24 = _wilder_rsi(gain, loss, 24)
 
             # 创建子图
             gs = self.figure.add_gridspec(2, 1, height_ratios=[2, 1])
@@ -305,20 +937,18 @@ class ChartWindow(QDialog):
             ax1.tick_params(axis='x', rotation=45)
             ax2.tick_params(axis='x', rotation=45)
 
+            self.canvas.draw_idle()
+
         except Exception as e:
             print(f"绘制RSI失败: {e}")
             import traceback
             traceback.print_exc()
 
     def plot_candlestick(self):
-        try:
-            stock_data = ak.stock_zh_a_hist(
-                symbol=self.stock_code,
-                period="daily",
-                start_date=(datetime.now() - timedelta(days=60)).strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d')
-            )
+        self._fetch_daily(60, self._render_candlestick, 'K线图')
 
+    def _render_candlestick(self, stock_data):
+        try:
             # 准备数据
             stock_data.index = pd.to_datetime(stock_data['日期'])
             stock_data = stock_data.rename(columns={
@@ -338,17 +968,10 @@ class ChartWindow(QDialog):
             # 成交量图子图
             ax2 = self.figure.add_subplot(gs[1])
 
-            # 设置K线图样式
-            mc = mpf.make_marketcolors(up='red', down='green',
-                                       edge='inherit',
-                                       wick='inherit',
-                                       volume='in')
-            s = mpf.make_mpf_style(marketcolors=mc)
-
-            # 绘制K线图和成交量
+            # 绘制K线图和成交量（样式为模块级常量）
             mpf.plot(stock_data,
                      type='candle',
-                     style=s,
+                     style=_MPF_STYLE,
                      ax=ax1,
                      volume=ax2,
                      tight_layout=True)
@@ -356,6 +979,8 @@ class ChartWindow(QDialog):
             # 设置标题
             self.figure.suptitle(f'{self.stock_code} K线图')
 
+            self.canvas.draw_idle()
+
         except Exception as e:
             print(f"绘制K线图失败: {e}")
             import traceback
@@ -364,10 +989,38 @@ class ChartWindow(QDialog):
 class StockScreener(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.ma_trend_cache = {}  # 添加缓存字典
+        # 多头判断缓存：键带交易日，带TTL，锁保护（线程池里会并发读写）
+        self.ma_trend_cache = {}  # (代码, 日期) -> (时间戳, 结果)
+        self._ma_trend_lock = threading.RLock()
+        self.ma_trend_ttl = 3600  # 秒
         self.market_trend_cache = {}  # 添加大盘趋势缓存
+        self._spot_cache = (0.0, None)  # 实时行情快照缓存 (时间戳, DataFrame)
+        self._row_by_code = {}  # 股票代码 -> 表格行号
+        self._last_snapshot = {}  # 股票代码 -> 上次显示的各列取值
+        self._spot_cols = None  # 最近一次行情的各列numpy数组，供排序复用
+        self._sort_state = (None, False)  # (当前排序列, 是否降序)
+        self._fetch_cache = {}  # 接口名 -> (时间戳, 结果)，供_cached复用
         self.initUI()
 
+    def _get_spot(self, ttl=15):
+        """获取实时行情快照，ttl秒内的重复调用直接返回缓存，避免重复网络请求"""
+        ts, df = self._spot_cache
+        if df is not None and time.time() - ts < ttl:
+            return df
+        df = _postprocess_spot(ak.stock_zh_a_spot_em())
+        self._spot_cache = (time.time(), df)
+        return df
+
+    def _cached(self, key, fn, ttl=60):
+        """会话级TTL缓存：一轮分析内重复的akshare抓取直接复用上次结果"""
+        now = time.time()
+        entry = self._fetch_cache.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        value = fn()
+        self._fetch_cache[key] = (now, value)
+        return value
+
     def initUI(self):
         self.setWindowTitle('股票筛选器')
         self.setGeometry(100, 100, 1200, 800)
@@ -499,6 +1152,11 @@ class StockScreener(QMainWindow):
         self.stock_table.setColumnCount(6)
         self.stock_table.setHorizontalHeaderLabels(['代码', '名称', '现价', '涨跌幅', '换手率', '量比'])
         self.stock_table.cellClicked.connect(self.show_stock_charts)
+        # 点击表头用numpy argsort整体重排，不走Qt逐项比较的排序
+        header = self.stock_table.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self._sort_stock_table)
         splitter.addWidget(self.stock_table)
 
         # 添加筛选结果表格
@@ -540,6 +1198,7 @@ class StockScreener(QMainWindow):
 
     def clear_filter_conditions(self):
         # 清空所有筛选条件
+        self._ensure_filter_widgets()
         self.top_n_spin.setValue(0)
         self.turnover_min.setValue(0)
         self.turnover_max.setValue(0)
@@ -565,6 +1224,7 @@ class StockScreener(QMainWindow):
 
     def set_default_conditions(self):
         # 设置默认筛选条件
+        self._ensure_filter_widgets()
         self.top_n_spin.setValue(0)
         self.turnover_min.setValue(3)
         self.turnover_max.setValue(10)
@@ -599,8 +1259,25 @@ class StockScreener(QMainWindow):
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_btn)
         layout.addLayout(search_layout)
-        # 创建筛选条件区域
-        filter_widget = QWidget()
+        # 筛选条件区域放在可折叠的分组框里，首次展开时才构建内部控件
+        # （约25个QSpinBox/QCheckBox及其布局计算不再拖慢窗口启动）
+        self._filter_widgets_built = False
+        self.filter_group = QGroupBox('筛选条件')
+        self.filter_group.setCheckable(True)
+        self.filter_group.setChecked(False)
+        self.filter_group.toggled.connect(self._on_filter_group_toggled)
+        layout.addWidget(self.filter_group)
+
+    def _on_filter_group_toggled(self, checked):
+        if checked:
+            self._ensure_filter_widgets()
+
+    def _ensure_filter_widgets(self):
+        # 懒构建筛选控件，只执行一次
+        if self._filter_widgets_built:
+            return
+        self._filter_widgets_built = True
+
         filter_layout = QGridLayout()
         current_row = 0
 
@@ -715,8 +1392,7 @@ class StockScreener(QMainWindow):
         filter_layout.addWidget(self.macd_golden_cb, current_row, 1)
         filter_layout.addWidget(self.kdj_golden_cb, current_row, 2)
 
-        filter_widget.setLayout(filter_layout)
-        layout.addWidget(filter_widget)
+        self.filter_group.setLayout(filter_layout)
 
     def search_stocks(self):
         search_text = self.search_input.text().strip()
@@ -724,33 +1400,23 @@ class StockScreener(QMainWindow):
             return
 
         try:
-            df = ak.stock_zh_a_spot_em()
+            df = self._get_spot()
 
             # 将中英文逗号统一替换为英文逗号后再分割
-            search_items = [item.strip() for item in search_text.replace('，', ',').split(',')]
-
-            all_matches = pd.DataFrame()
-
-            for search_item in search_items:
-                if not search_item:
-                    continue
+            search_items = [item.strip() for item in search_text.replace('，', ',').split(',') if item.strip()]
+            if not search_items:
+                return
 
-                # 精确匹配
-                exact_matches = df[
-                    (df['代码'] == search_item) |
-                    (df['名称'] == search_item)
-                    ]
+            # 精确匹配（isin一次完成全部关键词）
+            all_matches = df[df['代码'].isin(search_items) | df['名称'].isin(search_items)]
 
-                # 如果没有精确匹配，进行模糊搜索
-                if exact_matches.empty:
-                    fuzzy_matches = df[
-                        (df['代码'].str.contains(search_item, case=False, na=False)) |
-                        (df['名称'].str.contains(search_item, case=False, na=False))
-                        ]
-                    if not fuzzy_matches.empty:
-                        all_matches = pd.concat([all_matches, fuzzy_matches])
-                else:
-                    all_matches = pd.concat([all_matches, exact_matches])
+            # 没有精确匹配时，用合并后的正则做一次模糊搜索（每列只扫一遍）
+            if all_matches.empty:
+                pattern = '|'.join(map(re.escape, search_items))
+                all_matches = df[
+                    df['代码'].str.contains(pattern, case=False, na=False) |
+                    df['名称'].str.contains(pattern, case=False, na=False)
+                ]
 
             if not all_matches.empty:
                 # 去重
@@ -766,57 +1432,81 @@ class StockScreener(QMainWindow):
 
     def refresh_data(self):
         self.clear_ma_trend_cache()
+        # 行情抓取放到线程池，表格填充在主线程slot中完成
+        run_async(
+            self._get_spot,
+            self._on_spot_ready,
+            lambda msg: print(f"刷新数据失败: {msg}")
+        )
+
+    def _on_spot_ready(self, df):
         try:
-            df = ak.stock_zh_a_spot_em()
-            self.stock_table.setRowCount(len(df))
-
-            for i, (_, row) in enumerate(df.iterrows()):
-                self.stock_table.setItem(i, 0, QTableWidgetItem(str(row['代码'])))
-                self.stock_table.setItem(i, 1, QTableWidgetItem(str(row['名称'])))
-                self.stock_table.setItem(i, 2, NumericTableWidgetItem(str(row['最新价'])))
-                self.stock_table.setItem(i, 3, NumericTableWidgetItem(str(row['涨跌幅'])))
-                self.stock_table.setItem(i, 4, NumericTableWidgetItem(str(row['换手率'])))
-                self.stock_table.setItem(i, 5, NumericTableWidgetItem(str(row['量比'])))
+            # 整列取出numpy数组，避免iterrows逐行构造Series的开销
+            codes = df['代码'].to_numpy()
+            names = df['名称'].to_numpy()
+            prices = df['最新价'].to_numpy()
+            changes = df['涨跌幅'].to_numpy()
+            turnovers = df['换手率'].to_numpy()
+            volume_ratios = df['量比'].to_numpy()
+
+            n = len(df)
+            self._spot_cols = (codes, names, prices, changes, turnovers, volume_ratios)
+
+            # 填表期间关闭刷新和信号，结束后一次性重绘；
+            # 中途出错也要恢复，否则主表停止重绘、点击开图的信号也一直被屏蔽
+            table = self.stock_table
+            table.setSortingEnabled(False)
+            table.setUpdatesEnabled(False)
+            table.blockSignals(True)
+            try:
+                if len(self._row_by_code) != n or set(map(str, codes)) != self._row_by_code.keys():
+                    # 股票集合发生变化（首次加载/增删股票），全量重建
+                    self._populate_stock_rows(np.arange(n))
+                else:
+                    # 股票集合没变，只重写取值有变化的单元格
+                    last = self._last_snapshot
+                    for i in range(n):
+                        code = str(codes[i])
+                        vals = (names[i], prices[i], changes[i],
+                                turnovers[i], volume_ratios[i])
+                        old = last.get(code)
+                        if old == vals:
+                            continue
+                        row = self._row_by_code[code]
+                        if old is None or old[0] != vals[0]:
+                            table.setItem(row, 1, QTableWidgetItem(str(vals[0])))
+                        for col in range(1, 5):
+                            if old is None or old[col] != vals[col]:
+                                table.setItem(row, col + 1, NumericTableWidgetItem(str(vals[col]), vals[col]))
+                        last[code] = vals
+            finally:
+                table.blockSignals(False)
+                table.setUpdatesEnabled(True)
+
+            # 刷新后保持用户上次选择的排序
+            sort_col, descending = self._sort_state
+            if sort_col is not None:
+                self._sort_stock_table(sort_col, toggle=False)
 
             # 筛选并显示增长股票
             growing_stocks = df[df['涨跌幅'] > 0].sort_values(by='涨跌幅', ascending=False)
-            growing_stocks_text = ', '.join([f"{row['名称']}"
-                                                 for _, row in growing_stocks.iterrows()])
-            # 筛选主板增长股票（排除创业板、科创板和北交所）
-            main_board_stocks = growing_stocks[
-                (~growing_stocks['代码'].str.startswith('300')) &  # 排除创业板
-                (~growing_stocks['代码'].str.startswith('688')) &  # 排除科创板
-                (~growing_stocks['代码'].str.startswith('430')) &  # 排除北交所
-                (~growing_stocks['代码'].str.startswith('689')) &  # 排除科创板
-                (~growing_stocks['代码'].str.startswith('830')) &  # 排除北交所
-                (~growing_stocks['代码'].str.startswith('839'))  # 排除北交所
-                ]
 
-            # 更新所有增长股票显示
-            growing_stocks_text = ', '.join([
-                f"{row['名称']}"
-                for _, row in growing_stocks.iterrows()
-            ])
+            # 一次性计算主板掩码（排除创业板、科创板和北交所），避免6次全列扫描
+            main_board_mask = ~df['代码'].str.startswith(EXCLUDE_PREFIXES)
+
+            # 筛选主板增长股票
+            main_board_stocks = growing_stocks[main_board_mask.loc[growing_stocks.index]]
+
+            # 名称列直接在C层拼接，替代iterrows+f-string逐行拼
+            growing_stocks_text = growing_stocks['名称'].str.cat(sep=', ')
             self.growing_stocks_edit.setText(growing_stocks_text)
 
-            # 更新主板增长股票显示
-            main_board_stocks_text = ', '.join([
-                f"{row['名称']}"
-                for _, row in main_board_stocks.iterrows()
-            ])
+            main_board_stocks_text = main_board_stocks['名称'].str.cat(sep=', ')
             self.main_board_stocks_edit.setText(main_board_stocks_text)
-            # self.growing_stocks_edit.setText(growing_stocks_text)
-            # 筛选主板涨停票
-            limit_up_stocks = df[
-                (df['涨跌幅'] >= 9.5) &  # 涨停幅度为10%
-                (~df['代码'].str.startswith('300')) &  # 排除创业板
-                (~df['代码'].str.startswith('688')) &  # 排除科创板
-                (~df['代码'].str.startswith('430')) &  # 排除北交所
-                (~df['代码'].str.startswith('689')) &  # 排除科创板
-                (~df['代码'].str.startswith('830')) &  # 排除北交所
-                (~df['代码'].str.startswith('839'))  # 排除北交所
-                ]
-            limit_up_stocks_text = ', '.join([f"{row['名称']}" for _, row in limit_up_stocks.iterrows()])
+
+            # 筛选主板涨停票（复用主板掩码）
+            limit_up_stocks = df[(df['涨跌幅'] >= 9.5) & main_board_mask]
+            limit_up_stocks_text = limit_up_stocks['名称'].str.cat(sep=', ')
 
 
             print(f"所有增长股票显示: {growing_stocks_text}\n")
@@ -836,77 +1526,94 @@ class StockScreener(QMainWindow):
         except Exception as e:
             print(f"刷新数据失败: {e}")
 
+    def _populate_stock_rows(self, order):
+        """按order给定的行序全量填充股票表格，并重建代码->行号映射
+
+        逐列填充：每个循环访问同一数组、同一种item类型，分支和缓存行为更友好。
+        排序值直接传入NumericTableWidgetItem，避免每个item再解析一次文本。
+        """
+        codes, names, prices, changes, turnovers, volume_ratios = self._spot_cols
+        table = self.stock_table
+        n = len(order)
+        table.setRowCount(n)
+        for row, i in enumerate(order):
+            table.setItem(row, 0, QTableWidgetItem(str(codes[i])))
+        for row, i in enumerate(order):
+            table.setItem(row, 1, QTableWidgetItem(str(names[i])))
+        for col, arr in ((2, prices), (3, changes), (4, turnovers), (5, volume_ratios)):
+            for row, i in enumerate(order):
+                table.setItem(row, col, NumericTableWidgetItem(str(arr[i]), arr[i]))
+        self._row_by_code = {str(codes[i]): row for row, i in enumerate(order)}
+        self._last_snapshot = {
+            str(codes[i]): (names[i], prices[i], changes[i],
+                            turnovers[i], volume_ratios[i])
+            for i in order
+        }
+
+    def _sort_stock_table(self, col, toggle=True):
+        # 排序顺序用numpy一次算出，再整体重排行，避免Qt逐项__lt__比较
+        if self._spot_cols is None:
+            return
+        prev_col, descending = self._sort_state
+        if toggle:
+            descending = not descending if col == prev_col else False
+        arr = self._spot_cols[col]
+        if col >= 2:
+            order = np.argsort(arr.astype(np.float64), kind='stable')
+        else:
+            order = np.argsort(arr.astype(str), kind='stable')
+        if descending:
+            order = order[::-1]
+        self._sort_state = (col, descending)
+
+        table = self.stock_table
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        self._populate_stock_rows(order)
+        table.blockSignals(False)
+        table.setUpdatesEnabled(True)
+        table.horizontalHeader().setSortIndicator(
+            col, Qt.DescendingOrder if descending else Qt.AscendingOrder)
+
     def check_ma_trend(self, stock_code):
-        # 检查缓存
-        if stock_code in self.ma_trend_cache:
-            return self.ma_trend_cache[stock_code]
+        # 检查缓存：键带交易日（隔天自动失效），TTL内直接返回
+        today = datetime.now()
+        end_date = today.strftime('%Y%m%d')
+        key = (stock_code, end_date)
+        now = time.time()
+        with self._ma_trend_lock:
+            cached = self.ma_trend_cache.get(key)
+            if cached is not None and now - cached[0] < self.ma_trend_ttl:
+                return cached[1]
 
         try:
-            # 获取60天的历史数据
-            hist_data = ak.stock_zh_a_hist(
-                symbol=stock_code,
-                period="daily",
-                start_date=(datetime.now() - timedelta(days=60)).strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d')
+            # 获取60天的历史数据（日期串与缓存键共用同一次strftime）
+            hist_data = fetch_hist(
+                stock_code,
+                "daily",
+                (today - timedelta(days=60)).strftime('%Y%m%d'),
+                end_date
             )
 
             if hist_data.empty:
-                return (False, None)
-
-            # 计算均线
-            ma5 = hist_data['收盘'].rolling(5).mean()
-            ma10 = hist_data['收盘'].rolling(10).mean()
-            ma20 = hist_data['收盘'].rolling(20).mean()
-            ma30 = hist_data['收盘'].rolling(30).mean()
-
-            # 计算均线的变化率（斜率）
-            ma5_slope = ma5.diff()
-            ma10_slope = ma10.diff()
-            ma20_slope = ma20.diff()
-            ma30_slope = ma30.diff()
-
-            # 获取最近几天的数据来判断拐点
-            lookback_days = 3  # 向前看3天的趋势变化
-
-            # 判断均线拐头向上的条件：
-            # 1. 最近一天的斜率为正（向上）
-            # 2. 之前的斜率为负（向下）或接近于0
-            # 3. 斜率由负变正，表示出现拐点
-            is_turning_up = (
-                # MA5拐头向上
-                (ma5_slope.iloc[-1] > 0) and  # 最近一天向上
-                (ma5_slope.iloc[-lookback_days:-1].mean() <= 0) and  # 之前趋势向下
-
-                # MA10拐头向上
-                (ma10_slope.iloc[-1] > 0) and
-                (ma10_slope.iloc[-lookback_days:-1].mean() <= 0) and
-
-                # MA20拐头向上
-                (ma20_slope.iloc[-1] > 0) and
-                (ma20_slope.iloc[-lookback_days:-1].mean() <= 0)
-            )
+                return (False, None, None)
 
-            # 判断多头排列
-            is_bullish = (
-                # 当前多头排列
-                (ma5.iloc[-1] > ma10.iloc[-1] > ma20.iloc[-1] > ma30.iloc[-1]) and
-                # 均线斜率都为正
-                (ma5_slope.iloc[-1] > 0) and
-                (ma10_slope.iloc[-1] > 0) and
-                (ma20_slope.iloc[-1] > 0) and
-                (ma30_slope.iloc[-1] > 0)
-            )
+            # 均线拐头/多头判断下沉到numpy核心函数，向前看3天的趋势变化
+            close = hist_data['收盘'].to_numpy(np.float64)
+            is_turning_up, is_bullish = _ma_signals(close, lookback=3)
 
             # 获取最新数据
             latest = hist_data.iloc[-1]
 
-            result = (is_turning_up or is_bullish, latest)
-            self.ma_trend_cache[stock_code] = result
+            # 历史数据一并返回，调用方做量价齐升等后续判断时不必再抓一次
+            result = (is_turning_up or is_bullish, latest, hist_data)
+            with self._ma_trend_lock:
+                self.ma_trend_cache[key] = (time.time(), result)
             return result
 
         except Exception as e:
             print(f"处理股票{stock_code}时出错: {e}")
-            return (False, None)
+            return (False, None, None)
 
     def check_vol_price_up(self, stock_code, hist_data, days=3):
         """
@@ -924,20 +1631,11 @@ class StockScreener(QMainWindow):
             if len(hist_data) < days + 1:  # 确保有足够的数据
                 return False
 
-            # 逐日比较
-            for i in range(days):
-                today = hist_data.iloc[-(i + 1)]  # 当前日
-                yesterday = hist_data.iloc[-(i + 2)]  # 前一日
-
-                # 判断量价齐升
-                price_up = today['收盘'] > yesterday['收盘']
-                volume_up = today['成交量'] > yesterday['成交量']
-
-                # 如果任一天不满足量价齐升，返回False
-                if not (price_up and volume_up):
-                    return False
-
-            return True
+            # 尾部切片一次diff，每天都要收盘价和成交量同时高于前一日
+            close_tail = hist_data['收盘'].to_numpy()[-(days + 1):]
+            vol_tail = hist_data['成交量'].to_numpy()[-(days + 1):]
+            return bool((np.diff(close_tail) > 0).all() and
+                        (np.diff(vol_tail) > 0).all())
 
         except Exception as e:
             print(f"检查量价齐升时出错 {stock_code}: {e}")
@@ -945,57 +1643,39 @@ class StockScreener(QMainWindow):
 
     def show_ma_stocks(self):
         try:
-            df = ak.stock_zh_a_spot_em()
-            # 筛选主板股票
-            main_board_stocks = df[
-                (~df['代码'].str.startswith('300')) &
-                (~df['代码'].str.startswith('688')) &
-                (~df['代码'].str.startswith('430')) &
-                (~df['代码'].str.startswith('689')) &
-                (~df['代码'].str.startswith('830')) &
-                (~df['代码'].str.startswith('839'))
-                ]
-
-            # 创建六个列表分别存储不同类型的股票
-            ma_up_not_limit = []  # 多头向上且上涨但非涨停
-            ma_up_not_limit_vol = []  # 多头向上且上涨但非涨停且量价齐升
-            ma_up_limit = []  # 多头向上且涨停
-            ma_up_limit_vol = []  # 多头向上且涨停且量价齐升
-            ma_down = []  # 多头向上且下跌
-            ma_down_vol = []  # 多头向上且下跌且量价齐升
-
-            for _, stock in main_board_stocks.iterrows():
-                try:
-                    is_bullish, latest = self.check_ma_trend(stock['代码'])
-                    if is_bullish:
-                        # 获取历史数据用于量价齐升判断
-                        hist_data = ak.stock_zh_a_hist(
-                            symbol=stock['代码'],
-                            period="daily",
-                            start_date=(datetime.now() - timedelta(days=5)).strftime('%Y%m%d'),
-                            end_date=datetime.now().strftime('%Y%m%d')
-                        )
-
-                        is_vol_price_up = self.check_vol_price_up(stock['代码'], hist_data)
-
-                        # 涨跌幅判断
-                        change_pct = stock['涨跌幅']
-                        if change_pct > 0:
-                            if change_pct >= 9.5:  # 涨停判断
-                                ma_up_limit.append(f"{stock['名称']}")
-                                if is_vol_price_up:
-                                    ma_up_limit_vol.append(f"{stock['名称']}")
-                            else:
-                                ma_up_not_limit.append(f"{stock['名称']}")
-                                if is_vol_price_up:
-                                    ma_up_not_limit_vol.append(f"{stock['名称']}")
-                        else:
-                            ma_down.append(f"{stock['名称']}")
-                            if is_vol_price_up:
-                                ma_down_vol.append(f"{stock['名称']}")
-                except Exception as e:
-                    print(f"处理股票 {stock['代码']} {stock['名称']} 时出错: {e}")
-                    continue
+            df = self._get_spot()
+            # 筛选主板股票（一次startswith扫完全部前缀，不再叠6个布尔Series）
+            main_board_stocks = df[~df['代码'].str.startswith(EXCLUDE_PREFIXES)]
+
+            def eval_code(stock_code):
+                # 多头判断 + 量价齐升判断；量价齐升直接复用多头判断取回的
+                # 60天历史（5天窗口是它的尾部切片），不再单独抓一次
+                is_bullish, latest, hist_data = self.check_ma_trend(stock_code)
+                if not is_bullish:
+                    return (False, False)
+                return (True, self.check_vol_price_up(stock_code, hist_data))
+
+            codes = main_board_stocks['代码'].tolist()
+            names = np.array(main_board_stocks['名称'].tolist())
+            changes = main_board_stocks['涨跌幅'].to_numpy(np.float64)
+            results = _parallel_map_codes(eval_code, codes)
+
+            # 并发结果转成布尔数组，6类名单各用一个掩码选出，
+            # 顺序与行情表一致，替代逐只股票的if/elif分拣
+            default = (False, False)
+            bullish_mask = np.array([results.get(c, default)[0] for c in codes], dtype=bool)
+            volup_mask = np.array([results.get(c, default)[1] for c in codes], dtype=bool)
+
+            limit = changes >= 9.5  # 涨停判断
+            up = (changes > 0) & ~limit
+            down = changes <= 0
+
+            ma_up_not_limit = names[bullish_mask & up].tolist()  # 多头向上且上涨但非涨停
+            ma_up_not_limit_vol = names[bullish_mask & up & volup_mask].tolist()  # 其中量价齐升
+            ma_up_limit = names[bullish_mask & limit].tolist()  # 多头向上且涨停
+            ma_up_limit_vol = names[bullish_mask & limit & volup_mask].tolist()  # 其中量价齐升
+            ma_down = names[bullish_mask & down].tolist()  # 多头向上且下跌
+            ma_down_vol = names[bullish_mask & down & volup_mask].tolist()  # 其中量价齐升
 
             # 生成显示文本
             ma_up_not_limit_text = ', '.join(ma_up_not_limit)
@@ -1027,27 +1707,18 @@ class StockScreener(QMainWindow):
 
     def show_ma_up_stocks(self):
         try:
-            df = ak.stock_zh_a_spot_em()
-            # 筛选主板上涨股票
+            df = self._get_spot()
+            # 筛选主板上涨股票（单次startswith替代6个前缀各扫一遍）
             main_board_up_stocks = df[
                 (df['涨跌幅'] > 0) &
-                (~df['代码'].str.startswith('300')) &
-                (~df['代码'].str.startswith('688')) &
-                (~df['代码'].str.startswith('430')) &
-                (~df['代码'].str.startswith('689')) &
-                (~df['代码'].str.startswith('830')) &
-                (~df['代码'].str.startswith('839'))
+                (~df['代码'].str.startswith(EXCLUDE_PREFIXES))
                 ]
 
-            ma_up_stocks = []
-            for _, stock in main_board_up_stocks.iterrows():
-                try:
-                    is_bullish, latest = self.check_ma_trend(stock['代码'])
-                    if is_bullish:
-                        ma_up_stocks.append(f"{stock['名称']}")
-                except Exception as e:
-                    print(f"处理股票 {stock['代码']} {stock['名称']} 时出错: {e}")
-                    continue
+            codes = main_board_up_stocks['代码'].tolist()
+            names = main_board_up_stocks['名称'].tolist()
+            # 多头判断并发执行，结果按行情表原顺序收集
+            results = _parallel_map_codes(lambda code: self.check_ma_trend(code)[0], codes)
+            ma_up_stocks = [f"{name}" for code, name in zip(codes, names) if results.get(code)]
 
             # 更新显示
             ma_up_stocks_text = ', '.join(ma_up_stocks)
@@ -1059,18 +1730,20 @@ class StockScreener(QMainWindow):
 
     # 可以添加一个清除缓存的方法
     def clear_ma_trend_cache(self):
-        self.ma_trend_cache.clear()
+        with self._ma_trend_lock:
+            self.ma_trend_cache.clear()
 
     def apply_filter(self):
-        # 进行筛选
+        # 进行筛选（筛选条件控件可能尚未展开构建，先补建并取默认值）
+        self._ensure_filter_widgets()
         filtered_stocks = self.filter_stocks()
         if filtered_stocks is not None:
             self.show_filtered_results(filtered_stocks)
 
     def filter_stocks(self):
         try:
-            # 获取实时行情数据
-            df = ak.stock_zh_a_spot_em()
+            # 获取实时行情数据（TTL内复用同一份快照，连续操作不重复拉全表）
+            df = self._get_spot()
 
             # 应用筛选条件
             # 换手率范围
@@ -1102,99 +1775,93 @@ class StockScreener(QMainWindow):
             if self.remove_limit_up_cb.isChecked():
                 df = df[df['涨跌幅'] < 9.5]
 
+            # 日期字符串整个筛选流程只算一次，不在每只股票的请求里重复strftime
+            now = datetime.now()
+            today = now.strftime('%Y%m%d')
+            start_date_60 = (now - timedelta(days=60)).strftime('%Y%m%d')
+
             if self.volume_increase_cb.isChecked():
-                volume_increasing_stocks = []
-                for index, row in df.iterrows():
-                    stock_code = row['代码']
+                def check_volume_increasing(stock_code):
                     hist_data = ak.stock_zh_a_hist_min_em(
                         symbol=stock_code,
                         period='1',
-                        start_date=(datetime.now()).strftime('%Y%m%d'),
-                        end_date=datetime.now().strftime('%Y%m%d')
+                        start_date=today,
+                        end_date=today
                     )
-                    if not hist_data.empty:
-                        recent_volumes = hist_data['成交量'].tail(3).values
-                        if len(recent_volumes) == 3 and all(
-                                recent_volumes[i] > recent_volumes[i - 1] for i in range(1, 3)):
-                            volume_increasing_stocks.append(stock_code)
+                    if hist_data.empty:
+                        return False
+                    recent_volumes = hist_data['成交量'].tail(3).values
+                    return len(recent_volumes) == 3 and all(
+                        recent_volumes[i] > recent_volumes[i - 1] for i in range(1, 3))
+
+                results = _parallel_map_codes(check_volume_increasing, df['代码'].tolist())
+                volume_increasing_stocks = [code for code, ok in results.items() if ok]
                 df = df[df['代码'].isin(volume_increasing_stocks)]
 
             # 技术指标
             if self.ma_alignment_cb.isChecked() or self.macd_golden_cb.isChecked() or self.kdj_golden_cb.isChecked():
-                technical_stocks = []
-                for index, row in df.iterrows():
-                    stock_code = row['代码']
-                    hist_data = ak.stock_zh_a_hist(symbol=stock_code, period="daily",
-                                                   start_date=(datetime.now() - timedelta(days=60)).strftime('%Y%m%d'),
-                                                   end_date=datetime.now().strftime('%Y%m%d'))
+                def check_technical(stock_code):
+                    hist_data = fetch_hist(stock_code, "daily", start_date_60, today)
 
                     if not hist_data.empty:
-                        # 计算技术指标
+                        # 技术指标一次算完，三个复选框共用同一组数组
+                        ind = _compute_indicators(
+                            hist_data['收盘'].to_numpy(np.float64),
+                            hist_data['最高'].to_numpy(np.float64),
+                            hist_data['最低'].to_numpy(np.float64)
+                        )
+
                         if self.ma_alignment_cb.isChecked():
-                            # 计算MA5, MA10, MA20
-                            ma5 = hist_data['收盘'].rolling(5).mean().iloc[-1]
-                            ma10 = hist_data['收盘'].rolling(10).mean().iloc[-1]
-                            ma20 = hist_data['收盘'].rolling(20).mean().iloc[-1]
-                            if not (ma5 > ma10 > ma20):
-                                continue
+                            if not (ind['ma5'][-1] > ind['ma10'][-1] > ind['ma20'][-1]):
+                                return False
 
                         if self.macd_golden_cb.isChecked():
-                            # 计算MACD
-                            exp1 = hist_data['收盘'].ewm(span=12, adjust=False).mean()
-                            exp2 = hist_data['收盘'].ewm(span=26, adjust=False).mean()
-                            macd = exp1 - exp2
-                            signal = macd.ewm(span=9, adjust=False).mean()
-                            if not (macd.iloc[-1] > signal.iloc[-1] and macd.iloc[-2] <= signal.iloc[-2]):
-                                continue
+                            macd, signal = ind['macd'], ind['signal']
+                            if not (macd[-1] > signal[-1] and macd[-2] <= signal[-2]):
+                                return False
 
                         if self.kdj_golden_cb.isChecked():
-                            # 计算KDJ
-                            low_list = hist_data['最低'].rolling(9, min_periods=9).min()
-                            high_list = hist_data['最高'].rolling(9, min_periods=9).max()
-                            rsv = (hist_data['收盘'] - low_list) / (high_list - low_list) * 100
-                            k = rsv.ewm(com=2).mean()
-                            d = k.ewm(com=2).mean()
-                            if not (k.iloc[-1] > d.iloc[-1] and k.iloc[-2] <= d.iloc[-2]):
-                                continue
+                            if 'k' not in ind:
+                                return False
+                            k, d = ind['k'], ind['d']
+                            if not (k[-1] > d[-1] and k[-2] <= d[-2]):
+                                return False
 
-                    technical_stocks.append(stock_code)
+                    return True
 
+                results = _parallel_map_codes(check_technical, df['代码'].tolist())
+                technical_stocks = [code for code, ok in results.items() if ok]
                 df = df[df['代码'].isin(technical_stocks)]
 
             # 获取热门个股
             if self.hot_stocks_n.value() > 0:
                 df = df.nlargest(self.hot_stocks_n.value(), '成交额')
 
-            # 行业龙头筛选
+            # 行业龙头筛选：按市值整体排序后每个行业取前N，免去逐行业切片
             if self.top_n_spin.value() > 0:  # 只有当值大于0时才筛选
-                industry_leaders = []
-                for industry in df['所属行业'].unique():
-                    industry_stocks = df[df['所属行业'] == industry]
-                    leaders = industry_stocks.nlargest(self.top_n_spin.value(), '市值')
-                    industry_leaders.extend(leaders['代码'].tolist())
-                df = df[df['代码'].isin(industry_leaders)]
+                leaders_idx = (df.sort_values('市值', ascending=False)
+                                 .groupby('所属行业', sort=False)
+                                 .head(self.top_n_spin.value())
+                                 .index)
+                df = df.loc[df.index.isin(leaders_idx)]
 
             # 涨停次数分析
             if self.limit_up_times.value() > 0 and self.months_spin.value() > 0:  # 只有当两个值都大于0时才进行筛选
-                limit_up_stocks = []
                 months = self.months_spin.value()
                 required_times = self.limit_up_times.value()
 
-                start_date = (datetime.now() - timedelta(days=30 * months)).strftime('%Y%m%d')
-                end_date = datetime.now().strftime('%Y%m%d')
-
-                for index, row in df.iterrows():
-                    stock_code = row['代码']
-                    hist_data = ak.stock_zh_a_hist(symbol=stock_code, period="daily",
-                                                   start_date=start_date,
-                                                   end_date=end_date)
+                start_date = (now - timedelta(days=30 * months)).strftime('%Y%m%d')
 
-                    if not hist_data.empty:
-                        # 计算涨停次数
-                        limit_up_count = len(hist_data[hist_data['涨跌幅'] >= 9.5])
-                        if limit_up_count == required_times:
-                            limit_up_stocks.append(stock_code)
+                def check_limit_up_times(stock_code):
+                    hist_data = fetch_hist(stock_code, "daily", start_date, today)
+                    if hist_data.empty:
+                        return False
+                    # 计算涨停次数（布尔数组直接求和，不构造过滤后的DataFrame）
+                    limit_up_count = int((hist_data['涨跌幅'].to_numpy() >= 9.5).sum())
+                    return limit_up_count == required_times
 
+                results = _parallel_map_codes(check_limit_up_times, df['代码'].tolist())
+                limit_up_stocks = [code for code, ok in results.items() if ok]
                 df = df[df['代码'].isin(limit_up_stocks)]
 
             return df
@@ -1208,104 +1875,76 @@ class StockScreener(QMainWindow):
     def analyze_trading_signals(self, df):
         """分析股票交易信号"""
         try:
-            def get_price_position(code, current_price):
-                try:
-                    # 获取历史数据
-                    hist_data = ak.stock_zh_a_hist(
-                        symbol=code,
-                        period="daily",
-                        start_date=(datetime.now() - timedelta(days=120)).strftime('%Y%m%d'),
-                        end_date=datetime.now().strftime('%Y%m%d')
-                    )
-                    
-                    if hist_data.empty:
-                        return "未知"
-                    
-                    # 计算相对位置
-                    price_max = hist_data['收盘'].max()
-                    price_min = hist_data['收盘'].min()
-                    price_range = price_max - price_min
-                    
-                    if price_range == 0:
-                        return "未知"
-                    
-                    position = (current_price - price_min) / price_range * 100
-                    
-                    if position < 30:
-                        return "低位"
-                    elif position > 70:
-                        return "高位"
-                    else:
-                        return "中位"
-                    
-                except Exception as e:
-                    print(f"获取价格位置失败: {e}")
-                    return "未知"
+            codes = df['代码'].to_numpy()
+            names = df['名称'].to_numpy()
+            prices = df['最新价'].to_numpy()
+            changes = df['涨跌幅'].to_numpy(np.float64)
+            volume_ratios = df['量比'].to_numpy(np.float64)
+            turnovers = df['换手率'].to_numpy(np.float64)
+
+            # 价格位置批量计算：历史区间并发取回（命中缓存则不走网络），
+            # 每只股票只保留min/max两个标量，再整体向量化分桶
+            start_date = (datetime.now() - timedelta(days=120)).strftime('%Y%m%d')
+            end_date = datetime.now().strftime('%Y%m%d')
+
+            def fetch_close_range(code):
+                hist_data = fetch_hist(code, "daily", start_date, end_date)
+                if hist_data.empty:
+                    return None
+                close = hist_data['收盘'].to_numpy(np.float64)
+                return close.min(), close.max()
+
+            ranges = _parallel_map_codes(fetch_close_range, list(codes))
+            mins = np.empty(len(codes))
+            maxs = np.empty(len(codes))
+            for i, code in enumerate(codes):
+                r = ranges.get(code)
+                mins[i], maxs[i] = r if r is not None else (np.nan, np.nan)
+
+            price_range = maxs - mins
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pos_pct = (prices - mins) / price_range * 100
+            positions = np.select(
+                [~np.isfinite(pos_pct), pos_pct < 30, pos_pct > 70],
+                ['未知', '低位', '高位'],
+                default='中位'
+            )
+
+            # 评分用布尔数组一次算完，替代逐行if/elif累加
+            rating_score = (
+                (changes > 5) * 2 +
+                ((changes > 2) & (changes <= 5)) * 1 +
+                (volume_ratios > 2) * 1 +
+                (turnovers > 5) * 1 +
+                (positions == '低位') * 2
+            )
+            risk_score = (positions == '高位') * 2
+
+            # 建议按原if/elif顺序用np.select给出
+            advice = np.select(
+                [(rating_score >= 4) & (risk_score <= 1),
+                 (rating_score >= 2) & (risk_score <= 2),
+                 risk_score >= 3],
+                ['建议买入', '可以关注', '注意风险'],
+                default='建议观望'
+            )
+
+            results = [
+                {
+                    '代码': codes[i],
+                    '名称': names[i],
+                    '现价': prices[i],
+                    '涨跌幅': f"{changes[i]:.2f}%",
+                    '量比': f"{volume_ratios[i]:.2f}",
+                    '换手率': f"{turnovers[i]:.2f}%",
+                    '位置': positions[i],
+                    '建议': advice[i],
+                    '评分': int(rating_score[i]),
+                    '风险分': int(risk_score[i])
+                }
+                for i in range(len(codes))
+            ]
 
-            results = []
-            
-            for _, row in df.iterrows():
-                try:
-                    # 初始化评分变量
-                    rating_score = 0
-                    risk_score = 0  # 确保在这里初始化
-                    
-                    price = row['最新价']
-                    price_change = row['涨跌幅']
-                    volume_ratio = row['量比']
-                    turnover = row['换手率']
-                    position = get_price_position(row['代码'], price)
-                    
-                    # 分析建议
-                    regular_advice = ""
-                    xu_advice = ""
-                    regular_reason = ""
-                    xu_reason = ""
-                    
-                    # 根据技术指标和市场表现计算评分
-                    if price_change > 5:
-                        rating_score += 2
-                    elif price_change > 2:
-                        rating_score += 1
-                        
-                    if volume_ratio > 2:
-                        rating_score += 1
-                        
-                    if turnover > 5:
-                        rating_score += 1
-                        
-                    if position == "低位":
-                        rating_score += 2
-                    elif position == "高位":
-                        risk_score += 2
-                    
-                    # 生成建议
-                    if rating_score >= 4 and risk_score <= 1:
-                        final_advice = "建议买入"
-                    elif rating_score >= 2 and risk_score <= 2:
-                        final_advice = "可以关注"
-                    elif risk_score >= 3:
-                        final_advice = "注意风险"
-                    else:
-                        final_advice = "建议观望"
-                    
-                    results.append({
-                        '代码': row['代码'],
-                        '名称': row['名称'],
-                        '现价': price,
-                        '涨跌幅': f"{price_change:.2f}%",
-                        '量比': f"{volume_ratio:.2f}",
-                        '换手率': f"{turnover:.2f}%",
-                        '位置': position,
-                        '建议': final_advice,
-                        '评分': rating_score,
-                        '风险分': risk_score
-                    })
-                    
-                except Exception as e:
-                    print(f"分析股票 {row['代码']} 失败: {e}")
-                    continue
-            
             return pd.DataFrame(results)
             
         except Exception as e:
@@ -1347,54 +1986,56 @@ class StockScreener(QMainWindow):
         """)
         self.result_table.setAlternatingRowColors(True)
 
-        # 临时禁用排序以提高性能
+        # 临时禁用排序和刷新以提高性能，行数一次设好
         self.result_table.setSortingEnabled(False)
-
-        # 填充分析结果
-        for index, row in analysis_df.iterrows():
-            current_row = self.result_table.rowCount()
-            self.result_table.insertRow(current_row)
+        self.result_table.setUpdatesEnabled(False)
+        self.result_table.setRowCount(len(analysis_df))
+
+        numeric_columns = {'现价', '涨跌幅', '量比', '换手率', '评分', '风险分'}
+
+        # 填充分析结果：整列一次转成字符串数组，列的类型/着色策略循环外定好，
+        # 单元格里只剩构造、对齐和查好的颜色
+        if not analysis_df.empty:
+            col_text = {col: analysis_df[col].astype(str).to_numpy() for col in columns}
+            advices = analysis_df['建议'].to_numpy()
+            change_vals = pd.to_numeric(
+                analysis_df['涨跌幅'].astype(str).str.rstrip('%'),
+                errors='coerce'
+            ).to_numpy()
+            # 建议颜色整列查表一次
+            advice_fgs = [ADVICE_FG.get(a) for a in advices]
+            advice_bgs = [ADVICE_BG.get(a) for a in advices]
 
             for col_idx, column in enumerate(columns):
-                # 根据列类型创建不同的表格项
-                if column in ['现价', '涨跌幅', '量比', '换手率', '评分', '风险分']:
-                    item = NumericTableWidgetItem(str(row[column]))
-                else:
-                    item = QTableWidgetItem(str(row[column]))
-                
-                item.setTextAlignment(Qt.AlignCenter)
+                texts = col_text[column]
+                item_cls = (NumericTableWidgetItem if column in numeric_columns
+                            else QTableWidgetItem)
+                is_change = column == '涨跌幅'
+                is_advice = column == '建议'
+
+                for current_row in range(len(analysis_df)):
+                    item = item_cls(texts[current_row])
+                    item.setTextAlignment(Qt.AlignCenter)
 
-                # 设置涨跌幅颜色
-                if column == '涨跌幅':
-                    try:
-                        change = float(str(row[column]).replace('%', ''))
+                    # 设置涨跌幅颜色
+                    if is_change:
+                        change = change_vals[current_row]
                         if change > 0:
-                            item.setForeground(QBrush(QColor('#FF4444')))
+                            item.setForeground(BRUSH_RED)
                         elif change < 0:
-                            item.setForeground(QBrush(QColor('#00AA00')))
-                    except:
-                        pass
-
-                # 设置建议颜色
-                if column == '建议':
-                    if '买入' in str(row[column]) or '加仓' in str(row[column]):
-                        item.setForeground(QBrush(QColor('#FF4444')))
-                    elif '卖出' in str(row[column]) or '出局' in str(row[column]):
-                        item.setForeground(QBrush(QColor('#00AA00')))
-                    elif '观望' in str(row[column]) or '持有' in str(row[column]):
-                        item.setForeground(QBrush(QColor('#0088FF')))
-
-                self.result_table.setItem(current_row, col_idx, item)
-
-            # 设置行背景色
-            if '买入' in row['建议'] or '加仓' in row['建议']:
-                for col in range(len(columns)):
-                    self.result_table.item(current_row, col).setBackground(QBrush(QColor('#FFEEEE')))
-            elif '卖出' in row['建议'] or '出局' in row['建议']:
-                for col in range(len(columns)):
-                    self.result_table.item(current_row, col).setBackground(QBrush(QColor('#EEFFEE')))
-
-        # 重新启用排序
+                            item.setForeground(BRUSH_GREEN)
+                    # 设置建议颜色
+                    elif is_advice and advice_fgs[current_row] is not None:
+                        item.setForeground(advice_fgs[current_row])
+
+                    # 设置行背景色
+                    if advice_bgs[current_row] is not None:
+                        item.setBackground(advice_bgs[current_row])
+
+                    self.result_table.setItem(current_row, col_idx, item)
+
+        # 重新启用刷新和排序
+        self.result_table.setUpdatesEnabled(True)
         self.result_table.setSortingEnabled(True)
 
         # 调整列宽度
@@ -1414,135 +2055,161 @@ class StockScreener(QMainWindow):
     def analyze_limit_up_stocks(self):
         """分析涨停票并预测趋势"""
         try:
-            # 获取实时行情数据
-            df = ak.stock_zh_a_spot_em()
-            
+            # 获取实时行情数据（会话级缓存，短时间内重复分析不再重新抓取）
+            df = self._cached('spot_raw', ak.stock_zh_a_spot_em, ttl=15)
+
             # 获取上证指数数据
-            sh_index = ak.stock_zh_index_daily_em(symbol="sh000001")
-            
+            sh_index = self._cached(
+                'sh_index', lambda: ak.stock_zh_index_daily_em(symbol="sh000001"))
+
             # 获取行业信息
-            industry_df = ak.stock_board_industry_name_em()
-            
-            # 筛选涨停股票
+            industry_df = self._cached('industry_board', ak.stock_board_industry_name_em)
+
+            # 筛选涨停股票（排除创业板/科创板/北交所，一次startswith扫完）
             limit_up_stocks = df[
                 (df['涨跌幅'] >= 9.5) &  # 涨停
-                (~df['代码'].str.startswith('300')) &  # 排除创业板
-                (~df['代码'].str.startswith('688')) &  # 排除科创板
-                (~df['代码'].str.startswith('430')) &  # 排除北交所
-                (~df['代码'].str.startswith('689')) &  # 排除科创板
-                (~df['代码'].str.startswith('830')) &  # 排除北交所
-                (~df['代码'].str.startswith('839'))  # 排除北交所
+                (~df['代码'].str.startswith(EXCLUDE_PREFIXES))
             ]
-            
+
             # 获取行业资金流向
-            industry_flow = ak.stock_sector_fund_flow_rank()
-            
+            industry_flow = self._cached('sector_flow', ak.stock_sector_fund_flow_rank)
+
             # 获取热点消息
-            news = ak.stock_news_em()
-            
-            # 分析结果列表
-            analysis_results = []
-            
-            for _, stock in limit_up_stocks.iterrows():
+            news = self._cached('news', ak.stock_news_em)
+
+            # 代码->行业、行业->主力净流入、代码->消息条数一次建好查找表，
+            # 循环内从O(N)的DataFrame布尔过滤变成O(1)字典查找
+            ind_map = (dict(zip(industry_df['代码'].to_numpy(), industry_df['板块名称'].to_numpy()))
+                       if '代码' in industry_df.columns and '板块名称' in industry_df.columns
+                       else {})
+            flow_map = (dict(zip(industry_flow['行业'].to_numpy(), industry_flow['主力净流入-净额'].to_numpy()))
+                        if '行业' in industry_flow.columns
+                        else {})
+            news_counts = news['代码'].value_counts().to_dict() if '代码' in news.columns else {}
+
+            # 分析结果逐列累积，循环结束后一次性组装成DataFrame
+            result_cols = {col: [] for col in (
+                '代码', '名称', '现价', '涨跌幅', '量比', '换手率',
+                '特征', '趋势预测', '原因分析', '综合评级', '评级理由')}
+
+            # 日期字符串循环外算好
+            now = datetime.now()
+            start_date_30 = (now - timedelta(days=30)).strftime('%Y%m%d')
+            end_date = now.strftime('%Y%m%d')
+
+            # 历史数据和技术指标在进循环前并发批量算好（抓取阻塞在网络I/O上），
+            # 循环体内只剩查表和标量比较
+            def fetch_and_compute(code):
+                hist = fetch_hist(code, "daily", start_date_30, end_date)
+                if hist.empty:
+                    return None
+                return hist, _compute_indicators(hist['收盘'].to_numpy(np.float64))
+
+            prefetched = _parallel_map_codes(fetch_and_compute, list(limit_up_stocks['代码']))
+            hist_by_code = {c: v[0] for c, v in prefetched.items() if v is not None}
+            ind_by_code = {c: v[1] for c, v in prefetched.items() if v is not None}
+
+            # 候选股行情各列一次转成数组（SoA），循环内只做下标取标量，
+            # 不再用iterrows逐行装箱
+            lu_codes = limit_up_stocks['代码'].to_numpy()
+            lu_names = limit_up_stocks['名称'].to_numpy()
+            lu_prices = limit_up_stocks['最新价'].to_numpy()
+            lu_changes = limit_up_stocks['涨跌幅'].to_numpy()
+            lu_vol_ratios = limit_up_stocks['量比'].to_numpy()
+            lu_turnovers = limit_up_stocks['换手率'].to_numpy()
+
+            for i in range(lu_codes.size):
+                code = lu_codes[i]
+                vol_ratio = lu_vol_ratios[i]
+                turnover = lu_turnovers[i]
                 try:
-                    # 获取历史数据
-                    hist_data = ak.stock_zh_a_hist(
-                        symbol=stock['代码'],
-                        period="daily",
-                        start_date=(datetime.now() - timedelta(days=30)).strftime('%Y%m%d'),
-                        end_date=datetime.now().strftime('%Y%m%d')
-                    )
-                    
-                    if hist_data.empty:
+                    # 获取预先算好的历史数据
+                    hist_data = hist_by_code.get(code)
+
+                    if hist_data is None:
                         continue
-                    
+
                     # 确保列名正确
                     required_columns = ['收盘', '开盘', '最高', '最低', '成交量']
                     for col in required_columns:
                         if col not in hist_data.columns:
-                            print(f"股票 {stock['代码']} 缺少必要的列: {col}")
+                            print(f"股票 {code} 缺少必要的列: {col}")
                             continue
-                    
-                    # 计算技术指标
-                    ma5 = hist_data['收盘'].rolling(5).mean()
-                    ma10 = hist_data['收盘'].rolling(10).mean()
-                    ma20 = hist_data['收盘'].rolling(20).mean()
-                    
-                    # 计算RSI
-                    delta = hist_data['收盘'].diff()
-                    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                    rs = gain / loss
-                    rsi = 100 - (100 / (1 + rs))
-                    
-                    # 计算MACD
-                    exp1 = hist_data['收盘'].ewm(span=12, adjust=False).mean()
-                    exp2 = hist_data['收盘'].ewm(span=26, adjust=False).mean()
-                    macd = exp1 - exp2
-                    signal = macd.ewm(span=9, adjust=False).mean()
-                    
-                    # 获取最新数据
-                    latest = hist_data.iloc[-1]
-                    
+
+                    # 技术指标（MA/RSI/MACD）一次融合计算，共用同一条收盘价数组
+                    ind = ind_by_code[code]
+                    ma5, ma10, ma20 = ind['ma5'], ind['ma10'], ind['ma20']
+                    rsi = ind['rsi']
+                    macd, signal = ind['macd'], ind['signal']
+
+                    # 特征/原因/评级三段共用的判断先算成标量，避免同一组
+                    # 末值比较和均值归约做两三遍
+                    bull_stack = ma5[-1] > ma10[-1] > ma20[-1]
+                    bear_stack = ma5[-1] < ma10[-1] < ma20[-1]
+                    ma5_slope = (ma5[-1] - ma5[-5]) / ma5[-5] * 100 if bull_stack else 0.0
+                    rsi_last = rsi[-1]
+                    macd_golden = macd[-1] > signal[-1] and macd[-2] <= signal[-2]
+                    macd_dead = macd[-1] < signal[-1] and macd[-2] >= signal[-2]
+                    macd_strong = macd[-1] > 0 and signal[-1] > 0
+                    vol_arr = hist_data['成交量'].to_numpy(np.float64)
+                    vol_mean = vol_arr.mean()
+                    vol_last = vol_arr[-1]
+                    close_arr = hist_data['收盘'].to_numpy(np.float64)
+                    price_min = close_arr.min()
+                    price_max = close_arr.max()
+                    price_range = price_max - price_min
+
                     # 分析特征
                     features = []
                     
-                    # 1. 连续涨停次数
-                    limit_up_count = 0
-                    for i in range(len(hist_data)-1, -1, -1):
-                        if hist_data.iloc[i]['涨跌幅'] >= 9.5:
-                            limit_up_count += 1
-                        else:
-                            break
+                    # 1. 连续涨停次数：数尾部连续涨停的天数，替代逐行倒序回溯
+                    limit_flags = (hist_data['涨跌幅'].to_numpy() >= 9.5)[::-1]
+                    limit_up_count = int(len(limit_flags) if limit_flags.all()
+                                         else np.argmin(limit_flags))
                     features.append(f"连续涨停{limit_up_count}次")
                     
                     # 2. 量能特征
-                    if stock['量比'] > 2:
+                    if vol_ratio > 2:
                         features.append("放量涨停")
-                    elif stock['量比'] < 0.8:
+                    elif vol_ratio < 0.8:
                         features.append("缩量涨停")
                     
                     # 3. 均线特征
-                    if ma5.iloc[-1] > ma10.iloc[-1] > ma20.iloc[-1]:
+                    if bull_stack:
                         features.append("均线多头排列")
-                    elif ma5.iloc[-1] < ma10.iloc[-1] < ma20.iloc[-1]:
+                    elif bear_stack:
                         features.append("均线空头排列")
-                    
+
                     # 4. RSI特征
-                    if rsi.iloc[-1] > 80:
+                    if rsi_last > 80:
                         features.append("RSI超买")
-                    elif rsi.iloc[-1] < 20:
+                    elif rsi_last < 20:
                         features.append("RSI超卖")
-                    
+
                     # 5. MACD特征
-                    if macd.iloc[-1] > signal.iloc[-1] and macd.iloc[-2] <= signal.iloc[-2]:
+                    if macd_golden:
                         features.append("MACD金叉")
-                    elif macd.iloc[-1] < signal.iloc[-1] and macd.iloc[-2] >= signal.iloc[-2]:
+                    elif macd_dead:
                         features.append("MACD死叉")
                     
                     # 6. 行业资金流向
-                    try:
-                        # 获取股票所属行业
-                        stock_industry = industry_df[industry_df['代码'] == stock['代码']]['板块名称'].iloc[0]
-                        industry_flow_data = industry_flow[industry_flow['行业'] == stock_industry]
-                        if not industry_flow_data.empty:
-                            flow_value = industry_flow_data.iloc[0]['主力净流入-净额']
-                            if flow_value > 0:
-                                features.append(f"{stock_industry}资金净流入")
-                            else:
-                                features.append(f"{stock_industry}资金净流出")
-                    except:
-                        pass
-                    
+                    stock_industry = ind_map.get(code)
+                    flow_value = flow_map.get(stock_industry) if stock_industry is not None else None
+                    if flow_value is not None:
+                        if flow_value > 0:
+                            features.append(f"{stock_industry}资金净流入")
+                        else:
+                            features.append(f"{stock_industry}资金净流出")
+
                     # 7. 相关消息
-                    stock_news = news[news['代码'] == stock['代码']] if '代码' in news.columns else pd.DataFrame()
-                    if not stock_news.empty:
-                        features.append(f"相关消息{len(stock_news)}条")
+                    news_count = news_counts.get(code, 0)
+                    if news_count:
+                        features.append(f"相关消息{news_count}条")
                     
-                    # 预测趋势
-                    trend_prediction = self.predict_trend(
-                        hist_data, ma5, ma10, ma20, rsi, macd, signal
-                    )
+                    # 预测趋势（直接复用上面解包好的标量）
+                    trend_prediction = TREND_LABELS[_predict_trend_idx(
+                        ma5[-1], ma10[-1], ma20[-1], rsi_last,
+                        macd[-1], signal[-1], vol_last, vol_mean)]
                     
                     # 分析原因
                     reasons = []
@@ -1552,178 +2219,62 @@ class StockScreener(QMainWindow):
                         reasons.append(f"连续{limit_up_count}个涨停，说明上涨动能强")
                     
                     # 2. 量能分析
-                    if stock['量比'] > 2:
+                    if vol_ratio > 2:
                         reasons.append("放量涨停说明资金关注度高")
-                    elif stock['量比'] < 0.8:
+                    elif vol_ratio < 0.8:
                         reasons.append("缩量涨停需要谨慎对待")
                     
                     # 3. 均线系统分析
-                    if ma5.iloc[-1] > ma10.iloc[-1] > ma20.iloc[-1]:
-                        ma5_slope = (ma5.iloc[-1] - ma5.iloc[-5]) / ma5.iloc[-5] * 100
+                    if bull_stack:
                         if ma5_slope > 2:
                             reasons.append("均线多头排列且MA5快速上扬，趋势强劲")
                         else:
                             reasons.append("均线多头排列，趋势向好")
-                    elif ma5.iloc[-1] < ma10.iloc[-1] < ma20.iloc[-1]:
+                    elif bear_stack:
                         reasons.append("均线空头排列，需要观察突破情况")
-                    
+
                     # 4. RSI分析
-                    if rsi.iloc[-1] > 80:
+                    if rsi_last > 80:
                         reasons.append("RSI超买，注意回调风险")
-                    elif rsi.iloc[-1] < 30:
+                    elif rsi_last < 30:
                         reasons.append("RSI超卖，可能存在反弹机会")
-                    elif 50 < rsi.iloc[-1] < 70:
+                    elif 50 < rsi_last < 70:
                         reasons.append("RSI处于强势区间，走势健康")
-                    
+
                     # 5. MACD分析
-                    if macd.iloc[-1] > signal.iloc[-1] and macd.iloc[-2] <= signal.iloc[-2]:
+                    if macd_golden:
                         reasons.append("MACD金叉，买入信号确认")
-                    elif macd.iloc[-1] > 0 and signal.iloc[-1] > 0:
+                    elif macd_strong:
                         reasons.append("MACD处于零轴上方，属于强势区间")
                     
-                    # 6. 行业资金分析
-                    try:
-                        stock_industry = industry_df[industry_df['代码'] == stock['代码']]['板块名称'].iloc[0]
-                        industry_flow_data = industry_flow[industry_flow['行业'] == stock_industry]
-                        if not industry_flow_data.empty:
-                            flow_value = industry_flow_data.iloc[0]['主力净流入-净额']
-                            if flow_value > 0:
-                                reasons.append(f"{stock_industry}行业资金净流入，板块环境向好")
-                            else:
-                                reasons.append(f"{stock_industry}行业资金净流出，需要关注板块风险")
-                    except:
-                        pass
+                    # 6. 行业资金分析（复用循环外建好的查找表）
+                    if flow_value is not None:
+                        if flow_value > 0:
+                            reasons.append(f"{stock_industry}行业资金净流入，板块环境向好")
+                        else:
+                            reasons.append(f"{stock_industry}行业资金净流出，需要关注板块风险")
                     
                     # 7. 成交量分析
-                    vol_mean = hist_data['成交量'].mean()
-                    if latest['成交量'] > vol_mean * 2:
+                    if vol_last > vol_mean * 2:
                         reasons.append("成交量显著放大，资金关注度高")
-                    elif latest['成交量'] < vol_mean * 0.5:
+                    elif vol_last < vol_mean * 0.5:
                         reasons.append("成交量明显萎缩，需要观察量能配合")
                     
-                    # 8. 价格位置分析
-                    price_max = hist_data['收盘'].max()
-                    price_min = hist_data['收盘'].min()
-                    price_range = price_max - price_min
-                    
+                    # 8. 价格位置分析（最高/最低价已在上面一次归约算好）
                     # 添加边界检查和错误处理
                     if price_range == 0 or price_min == 0:
                         current_position = 50  # 默认值
                     else:
-                        current_position = (latest['收盘'] - price_min) / price_range * 100
-                    
-                    # 计算综合评级分数
-                    rating_score = 0
-                    risk_score = 0
-                    rating_reasons = []
-                    
-                    # 1. 连续涨停评分
-                    if limit_up_count >= 3:
-                        rating_score += 2
-                        rating_reasons.append("连续三板以上")
-                        risk_score += 1  # 同时增加风险分
-                    elif limit_up_count == 2:
-                        rating_score += 1
-                        rating_reasons.append("连续两板")
-                    
-                    # 2. 量能评分
-                    if stock['量比'] > 3:
-                        rating_score += 2
-                        rating_reasons.append("量能显著放大")
-                    elif stock['量比'] > 2:
-                        rating_score += 1
-                        rating_reasons.append("量能良好")
-                    elif stock['量比'] < 0.8:
-                        risk_score += 1
-                        rating_reasons.append("量能不足")
-                    
-                    # 3. 均线系统评分
-                    if ma5.iloc[-1] > ma10.iloc[-1] > ma20.iloc[-1]:
-                        ma5_slope = (ma5.iloc[-1] - ma5.iloc[-5]) / ma5.iloc[-5] * 100
-                        if ma5_slope > 2:
-                            rating_score += 2
-                            rating_reasons.append("均线系统强势")
-                        else:
-                            rating_score += 1
-                            rating_reasons.append("均线系统向好")
-                    elif ma5.iloc[-1] < ma10.iloc[-1] < ma20.iloc[-1]:
-                        risk_score += 1
-                        rating_reasons.append("均线系统弱势")
-                    
-                    # 4. RSI评分
-                    if 50 < rsi.iloc[-1] < 70:
-                        rating_score += 1
-                        rating_reasons.append("RSI健康")
-                    elif rsi.iloc[-1] > 80:
-                        risk_score += 2
-                        rating_reasons.append("RSI超买")
-                    elif rsi.iloc[-1] < 30:
-                        risk_score += 1
-                        rating_reasons.append("RSI超卖")
-                    
-                    # 5. MACD评分
-                    if macd.iloc[-1] > signal.iloc[-1] and macd.iloc[-2] <= signal.iloc[-2]:
-                        rating_score += 2
-                        rating_reasons.append("MACD金叉")
-                    elif macd.iloc[-1] > 0 and signal.iloc[-1] > 0:
-                        rating_score += 1
-                        rating_reasons.append("MACD强势")
-                    elif macd.iloc[-1] < signal.iloc[-1] and macd.iloc[-2] >= signal.iloc[-2]:
-                        risk_score += 1
-                        rating_reasons.append("MACD死叉")
-                    
-                    # 6. 行业资金评分
-                    try:
-                        stock_industry = industry_df[industry_df['代码'] == stock['代码']]['板块名称'].iloc[0]
-                        industry_flow_data = industry_flow[industry_flow['行业'] == stock_industry]
-                        if not industry_flow_data.empty:
-                            flow_value = industry_flow_data.iloc[0]['主力净流入-净额']
-                            if flow_value > 100000000:  # 1亿以上
-                                rating_score += 2
-                                rating_reasons.append("行业资金大幅流入")
-                            elif flow_value > 0:
-                                rating_score += 1
-                                rating_reasons.append("行业资金净流入")
-                            elif flow_value < -100000000:  # -1亿以下
-                                risk_score += 2
-                                rating_reasons.append("行业资金大幅流出")
-                            elif flow_value < 0:
-                                risk_score += 1
-                                rating_reasons.append("行业资金净流出")
-                    except:
-                        pass
-                    
-                    # 7. 价格位置评分
-                    if current_position < 30:
-                        rating_score += 2
-                        rating_reasons.append("低位突破")
-                    elif current_position > 70:
-                        risk_score += 2
-                        rating_reasons.append("高位风险")
-                    
-                    # 8. 成交量评分
-                    vol_mean = hist_data['成交量'].mean()
-                    if latest['成交量'] > vol_mean * 3:
-                        rating_score += 2
-                        rating_reasons.append("成交量显著放大")
-                    elif latest['成交量'] > vol_mean * 2:
-                        rating_score += 1
-                        rating_reasons.append("成交量放大")
-                    elif latest['成交量'] < vol_mean * 0.5:
-                        risk_score += 1
-                        rating_reasons.append("成交量萎缩")
-                    
-                    # 9. 换手率评分
-                    if stock['换手率'] > 15:
-                        rating_score += 2
-                        rating_reasons.append("换手充分")
-                    elif stock['换手率'] > 10:
-                        rating_score += 1
-                        rating_reasons.append("换手活跃")
-                    elif stock['换手率'] < 3:
-                        risk_score += 1
-                        rating_reasons.append("换手不足")
+                        current_position = (close_arr[-1] - price_min) / price_range * 100
                     
+                    # 计算综合评级分数（纯标量比较下沉到模块级函数）
+                    rating_score, risk_score, rating_reasons = _score_limit_up_stock(
+                        limit_up_count, vol_ratio, turnover,
+                        bull_stack, bear_stack, ma5_slope, rsi_last,
+                        macd_golden, macd_strong, macd_dead,
+                        flow_value, current_position, vol_last, vol_mean)
+
+
                     # 生成综合评级
                     rating = ""
                     if rating_score >= 8 and risk_score <= 2:
@@ -1737,142 +2288,90 @@ class StockScreener(QMainWindow):
                     else:
                         rating = "中性"
                     
-                    # 添加到分析结果
-                    analysis_results.append({
-                        '代码': stock['代码'],
-                        '名称': stock['名称'],
-                        '现价': stock['最新价'],
-                        '涨跌幅': stock['涨跌幅'],
-                        '量比': stock['量比'],
-                        '换手率': stock['换手率'],
-                        '特征': features,
-                        '趋势预测': trend_prediction,
-                        '原因分析': ' | '.join(reasons),
-                        '综合评级': rating,
-                        '评级理由': ' | '.join(rating_reasons)
-                    })
-                    
+                    # 添加到分析结果（逐列追加标量，不再构造每行的字典）
+                    for col, val in zip(result_cols, (
+                            code, lu_names[i], lu_prices[i],
+                            lu_changes[i], vol_ratio, turnover,
+                            features, trend_prediction, ' | '.join(reasons),
+                            rating, ' | '.join(rating_reasons))):
+                        result_cols[col].append(val)
+
                 except Exception as e:
-                    print(f"分析股票 {stock['代码']} 失败: {e}")
+                    print(f"分析股票 {code} 失败: {e}")
                     continue
-            
-            return analysis_results
-            
-        except Exception as e:
-            print(f"分析涨停票失败: {e}")
-            return []
 
-    def predict_trend(self, hist_data, ma5, ma10, ma20, rsi, macd, signal):
-        """预测股票趋势"""
-        try:
-            # 获取最新数据
-            latest = hist_data.iloc[-1]
-            latest_ma5 = ma5.iloc[-1]
-            latest_ma10 = ma10.iloc[-1]
-            latest_ma20 = ma20.iloc[-1]
-            latest_rsi = rsi.iloc[-1]
-            latest_macd = macd.iloc[-1]
-            latest_signal = signal.iloc[-1]
-            
-            # 计算趋势得分
-            trend_score = 0
-            
-            # 1. 均线系统得分
-            if latest_ma5 > latest_ma10 > latest_ma20:
-                trend_score += 2
-            elif latest_ma5 > latest_ma10:
-                trend_score += 1
-            
-            # 2. RSI得分
-            if 30 <= latest_rsi <= 70:
-                trend_score += 1
-            elif latest_rsi > 70:
-                trend_score -= 1
-            
-            # 3. MACD得分
-            if latest_macd > latest_signal:
-                trend_score += 1
-            elif latest_macd < latest_signal:
-                trend_score -= 1
-            
-            # 4. 量能得分
-            if latest['成交量'] > hist_data['成交量'].mean():
-                trend_score += 1
-            
-            # 根据得分预测趋势
-            if trend_score >= 3:
-                return "强势上涨"
-            elif trend_score >= 1:
-                return "震荡上涨"
-            elif trend_score >= -1:
-                return "震荡整理"
-            else:
-                return "可能回调"
-            
+            return pd.DataFrame(result_cols)
+
         except Exception as e:
-            print(f"预测趋势失败: {e}")
-            return "无法预测"
+            print(f"分析涨停票失败: {e}")
+            return pd.DataFrame()
 
     def show_limit_up_analysis(self):
         """显示涨停票分析结果"""
         try:
-            analysis_results = self.analyze_limit_up_stocks()
-            # 清空现有表格内容
-            self.result_table.clearContents()
-            self.result_table.setRowCount(0)
-            columns = ['代码', '名称', '现价', '涨跌幅', '量比', '换手率', '特征', '趋势预测', '原因分析', '综合评级', '评级理由']
-            self.result_table.setColumnCount(len(columns))
-            self.result_table.setHorizontalHeaderLabels(columns)
-            # 填充分析结果
-            for result in analysis_results:
-                current_row = self.result_table.rowCount()
-                self.result_table.insertRow(current_row)
-                for col_idx, column in enumerate(columns):
-                    item = NumericTableWidgetItem(str(result[column]))
-                    item.setTextAlignment(Qt.AlignCenter)
-                    # 设置涨跌幅颜色
-                    if column == '涨跌幅':
-                        try:
-                            change = float(str(result[column]).replace('%', ''))
-                            if change > 0:
-                                item.setForeground(QBrush(QColor('#FF4444')))
-                            elif change < 0:
-                                item.setForeground(QBrush(QColor('#00AA00')))
-                        except:
-                            pass
-                    # 设置趋势预测颜色
-                    if column == '趋势预测':
-                        if "上涨" in result[column]:
-                            item.setForeground(QBrush(QColor('#FF4444')))
-                        elif "回调" in result[column]:
-                            item.setForeground(QBrush(QColor('#00AA00')))
-                        else:
-                            item.setForeground(QBrush(QColor('#0088FF')))
-                    # 设置原因分析颜色
-                    if column == '原因分析':
-                        if "风险" in result[column]:
-                            item.setForeground(QBrush(QColor('#FF4444')))
-                        elif "向好" in result[column] or "强劲" in result[column]:
-                            item.setForeground(QBrush(QColor('#00AA00')))
-                    # 设置综合评级颜色
-                    if column == '综合评级':
-                        if "强烈推荐" in result[column]:
-                            item.setForeground(QBrush(QColor('#FF0000')))
-                            item.setBackground(QBrush(QColor('#FFEEEE')))
-                        elif "建议关注" in result[column]:
-                            item.setForeground(QBrush(QColor('#FF4444')))
-                        elif "强烈风险" in result[column]:
-                            item.setForeground(QBrush(QColor('#FFFFFF')))
-                            item.setBackground(QBrush(QColor('#FF4444')))
-                        elif "注意风险" in result[column]:
-                            item.setForeground(QBrush(QColor('#FF0000')))
-                    # 设置评级理由颜色
-                    if column == '评级理由':
-                        if "风险" in result[column] or "不足" in result[column] or "弱势" in result[column]:
-                            item.setForeground(QBrush(QColor('#FF4444')))
-                        elif "强势" in result[column] or "放大" in result[column] or "突破" in result[column]:
-                            item.setForeground(QBrush(QColor('#00AA00')))
-                    self.result_table.setItem(current_row, col_idx, item)
+            analysis_df = self.analyze_limit_up_stocks()
+            # 批量填充前关掉重绘/信号/排序，行数一次设好，避免逐行insertRow引发重排
+            self.result_table.setUpdatesEnabled(False)
+            self.result_table.blockSignals(True)
+            self.result_table.setSortingEnabled(False)
+            try:
+                # 清空现有表格内容
+                self.result_table.clearContents()
+                columns = ['代码', '名称', '现价', '涨跌幅', '量比', '换手率', '特征', '趋势预测', '原因分析', '综合评级', '评级理由']
+                self.result_table.setColumnCount(len(columns))
+                self.result_table.setHorizontalHeaderLabels(columns)
+                self.result_table.setRowCount(len(analysis_df))
+                # 填充分析结果：整列一次转成字符串数组，循环里只做下标访问
+                if not analysis_df.empty:
+                    col_text = {col: analysis_df[col].astype(str).to_numpy() for col in columns}
+                    for current_row in range(len(analysis_df)):
+                        for col_idx, column in enumerate(columns):
+                            text = col_text[column][current_row]
+                            item = NumericTableWidgetItem(text)
+                            item.setTextAlignment(Qt.AlignCenter)
+                            # 设置涨跌幅颜色
+                            if column == '涨跌幅':
+                                try:
+                                    change = float(text.replace('%', ''))
+                                    if change > 0:
+                                        item.setForeground(BRUSH_RED)
+                                    elif change < 0:
+                                        item.setForeground(BRUSH_GREEN)
+                                except:
+                                    pass
+                            # 设置趋势预测颜色
+                            elif column == '趋势预测':
+                                if "上涨" in text:
+                                    item.setForeground(BRUSH_RED)
+                                elif "回调" in text:
+                                    item.setForeground(BRUSH_GREEN)
+                                else:
+                                    item.setForeground(BRUSH_BLUE)
+                            # 设置原因分析颜色
+                            elif column == '原因分析':
+                                if "风险" in text:
+                                    item.setForeground(BRUSH_RED)
+                                elif "向好" in text or "强劲" in text:
+                                    item.setForeground(BRUSH_GREEN)
+                            # 设置综合评级颜色（查表代替逐格if-elif）
+                            elif column == '综合评级':
+                                colors = RATING_COLORS.get(text)
+                                if colors is not None:
+                                    item.setForeground(colors[0])
+                                    if colors[1] is not None:
+                                        item.setBackground(colors[1])
+                            # 设置评级理由颜色
+                            elif column == '评级理由':
+                                if "风险" in text or "不足" in text or "弱势" in text:
+                                    item.setForeground(BRUSH_RED)
+                                elif "强势" in text or "放大" in text or "突破" in text:
+                                    item.setForeground(BRUSH_GREEN)
+                            self.result_table.setItem(current_row, col_idx, item)
+            finally:
+                # 填充中途出错也要恢复重绘/信号/排序，result_table是主界面共用的
+                self.result_table.blockSignals(False)
+                self.result_table.setUpdatesEnabled(True)
+                self.result_table.setSortingEnabled(True)
             # 添加导出Excel按钮
             export_btn = QPushButton("导出Excel")
             export_btn.clicked.connect(lambda: self.export_to_excel(self.result_table))
@@ -1896,7 +2395,8 @@ class StockScreener(QMainWindow):
         """分析大盘趋势"""
         try:
             # 获取上证指数数据
-            sh_index = ak.stock_zh_index_daily_em(symbol="sh000001")
+            sh_index = self._cached(
+                'sh_index', lambda: ak.stock_zh_index_daily_em(symbol="sh000001"))
             if sh_index.empty:
                 print("获取上证指数数据为空")
                 return None
@@ -1927,11 +2427,8 @@ class StockScreener(QMainWindow):
             ma20 = sh_index['收盘'].rolling(20).mean()
             ma60 = sh_index['收盘'].rolling(60).mean()
             
-            # 计算MACD
-            exp1 = sh_index['收盘'].ewm(span=12, adjust=False).mean()
-            exp2 = sh_index['收盘'].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
+            # 计算MACD（复用_ema_af递推内核，免去三条pandas ewm序列）
+            macd, signal, _ = _macd_arrays(sh_index['收盘'].to_numpy(np.float64))
             
             # 计算RSI
             delta = sh_index['收盘'].diff()
@@ -1946,8 +2443,8 @@ class StockScreener(QMainWindow):
             latest_ma10 = ma10.iloc[-1]
             latest_ma20 = ma20.iloc[-1]
             latest_ma60 = ma60.iloc[-1]
-            latest_macd = macd.iloc[-1]
-            latest_signal = signal.iloc[-1]
+            latest_macd = macd[-1]
+            latest_signal = signal[-1]
             latest_rsi = rsi.iloc[-1]
             
             # 分析趋势
@@ -1959,8 +2456,8 @@ class StockScreener(QMainWindow):
                     'MA10斜率': (latest_ma10 - ma10.iloc[-5]) / ma10.iloc[-5] * 100
                 },
                 'MACD': {
-                    '金叉': latest_macd > latest_signal and macd.iloc[-2] <= signal.iloc[-2],
-                    '死叉': latest_macd < latest_signal and macd.iloc[-2] >= signal.iloc[-2],
+                    '金叉': latest_macd > latest_signal and macd[-2] <= signal[-2],
+                    '死叉': latest_macd < latest_signal and macd[-2] >= signal[-2],
                     '零轴上方': latest_macd > 0 and latest_signal > 0,
                     '零轴下方': latest_macd < 0 and latest_signal < 0
                 },
@@ -1972,14 +2469,15 @@ class StockScreener(QMainWindow):
                 }
             }
             
-            # 计算支撑压力位
-            recent_high = sh_index['最高'].tail(20).max()
-            recent_low = sh_index['最低'].tail(20).min()
+            # 计算支撑压力位（只要尾部20天，直接切numpy数组）
+            recent_high = sh_index['最高'].to_numpy()[-20:].max()
+            recent_low = sh_index['最低'].to_numpy()[-20:].min()
             current_price = latest['收盘']
-            
-            # 计算资金流向
-            volume_ma5 = sh_index['成交量'].rolling(5).mean()
-            volume_ma10 = sh_index['成交量'].rolling(10).mean()
+
+            # 计算资金流向：两条量能均线都只用最后一个点，尾窗均值即可
+            vol_arr = sh_index['成交量'].to_numpy(np.float64)
+            vol_ma5_last = vol_arr[-5:].mean()
+            vol_ma10_last = vol_arr[-10:].mean()
             
             # 判断趋势
             trend = "震荡整理"
@@ -2008,9 +2506,9 @@ class StockScreener(QMainWindow):
             # 分析板块情况
             try:
                 # 获取行业板块数据
-                industry_df = ak.stock_board_industry_name_em()
+                industry_df = self._cached('industry_board', ak.stock_board_industry_name_em)
                 # 获取行业资金流向
-                industry_flow = ak.stock_sector_fund_flow_rank()
+                industry_flow = self._cached('sector_flow', ak.stock_sector_fund_flow_rank)
                 
                 # 打印行业资金流向数据的列名和示例数据
                 print("行业资金流向数据列名:", industry_flow.columns.tolist())
@@ -2019,71 +2517,54 @@ class StockScreener(QMainWindow):
                 # 分析强势板块
                 strong_sectors = []
                 potential_sectors = []
-                
-                # 获取行业涨跌幅
-                industry_change = ak.stock_board_industry_cons_em()
 
-                # 添加字符串转数字的辅助函数
-                def convert_flow_value(value):
-                    try:
-                        if isinstance(value, (int, float)):
-                            return float(value)
-                        if not isinstance(value, str):
-                            return 0
-                        # 去除空格和特殊字符
-                        value = value.strip().replace(',', '')
-                        
-                        # 处理负数
-                        is_negative = value.startswith('-')
-                        if is_negative:
-                            value = value[1:]
-                        
-                        # 处理单位
-                        if '亿' in value:
-                            base_value = float(value.replace('亿', ''))
-                            result = base_value * 100000000
-                        elif '万' in value:
-                            base_value = float(value.replace('万', ''))
-                            result = base_value * 10000
-                        else:
-                            result = float(value)
-                        
-                        # 恢复负号
-                        return -result if is_negative else result
-                        
-                    except Exception as e:
-                        print(f"转换资金值失败: {value}, 错误: {e}")
-                        return 0
-                
+                # 资金列名只解析一次，整列向量化转换成浮点数，
+                # 循环里取值就退化成一次标量查表
+                possible_fields = ['今日主力净流入-净额', '主力净流入-净额', '主力净额']
+                flow_col = next((c for c in industry_flow.columns if c in possible_fields), None)
+                if flow_col is not None:
+                    industry_flow = industry_flow.copy()
+                    industry_flow[flow_col] = _parse_flow_series(industry_flow[flow_col])
+                    flow_col_idx = industry_flow.columns.get_loc(flow_col)
+
+
+                # 并行抓取各行业成分股（接口阻塞在网络I/O上），
+                # 合并成一张表后一次groupby算出各行业平均涨跌幅
+                def fetch_cons(name):
+                    cons = ak.stock_board_industry_cons_em(symbol=name)
+                    return cons[['涨跌幅']].assign(行业=name) if not cons.empty else None
+
+                frames = []
+                with ThreadPoolExecutor(max_workers=16) as pool:
+                    futures = {pool.submit(fetch_cons, name): name
+                               for name in industry_df['板块名称'].unique()}
+                    for future in as_completed(futures):
+                        try:
+                            cons = future.result()
+                            if cons is not None:
+                                frames.append(cons)
+                        except Exception as e:
+                            print(f"获取行业 {futures[future]} 成分股时出错: {e}")
+
+                if frames:
+                    avg_changes = pd.concat(frames, ignore_index=True).groupby('行业')['涨跌幅'].mean()
+                else:
+                    avg_changes = pd.Series(dtype=np.float64)
+
                 # 分析每个行业板块
-                for industry in industry_df['板块名称'].unique():
+                for industry, avg_change in avg_changes.items():
                     try:
-                        # 获取该行业的股票
-                        industry_stocks = ak.stock_board_industry_cons_em(symbol=industry)
-                        if industry_stocks.empty:
-                            continue
-                            
-                        # 计算行业平均涨跌幅
-                        avg_change = industry_stocks['涨跌幅'].mean()
-                        
                         # 获取行业资金流向
                         industry_flow_data = industry_flow[industry_flow['名称'] == industry]
                         if not industry_flow_data.empty:
                             # 打印当前行业的资金流向数据
                             print(f"\n处理行业: {industry}")
                             print("行业资金流向数据:\n", industry_flow_data)
-                            
-                            # 尝试不同的字段名
-                            flow_value = 0
-                            possible_fields = ['今日主力净流入-净额', '主力净流入-净额', '主力净额']
-                            for field in possible_fields:
-                                if field in industry_flow_data.columns:
-                                    value = industry_flow_data.iloc[0][field]
-                                    print(f"尝试字段 {field}: {value}")
-                                    flow_value = convert_flow_value(value)
-                                    if flow_value != 0:
-                                        break
-                            
+
+                            # 列号已在循环外解析成整数下标，这里是纯标量取值
+                            flow_value = (float(industry_flow_data.iat[0, flow_col_idx])
+                                          if flow_col else 0)
+
                             # 判断强势板块
                             if avg_change > 2 and flow_value > 0:
                                 strong_sectors.append({
@@ -2125,9 +2606,9 @@ class StockScreener(QMainWindow):
                 '当前价格': current_price,
                 '技术分析': trend_analysis,
                 '成交量分析': {
-                    '放量': latest['成交量'] > volume_ma5.iloc[-1] * 1.5,
-                    '缩量': latest['成交量'] < volume_ma5.iloc[-1] * 0.8,
-                    '量能趋势': "上升" if volume_ma5.iloc[-1] > volume_ma10.iloc[-1] else "下降"
+                    '放量': latest['成交量'] > vol_ma5_last * 1.5,
+                    '缩量': latest['成交量'] < vol_ma5_last * 0.8,
+                    '量能趋势': "上升" if vol_ma5_last > vol_ma10_last else "下降"
                 },
                 '强势板块': strong_sectors,
                 '潜力板块': potential_sectors
@@ -2142,136 +2623,84 @@ class StockScreener(QMainWindow):
     def analyze_money_flow(self):
         """分析资金流向"""
         try:
-            # 获取个股资金流向数据
-            stock_flow = ak.stock_individual_fund_flow_rank()
+            # 获取个股资金流向数据（会话级缓存）
+            stock_flow = self._cached('individual_flow', ak.stock_individual_fund_flow_rank)
             print("\n=== 数据结构检查 ===")
             print("列名:", stock_flow.columns.tolist())
             print("数据示例:\n", stock_flow.head())
             
-            # 获取A股实时行情数据以获取股票名称
-            stock_info = ak.stock_zh_a_spot_em()
-            stock_name_map = dict(zip(stock_info['代码'], stock_info['名称']))
+            # 获取A股实时行情数据以获取股票名称（代码->名称映射本身也缓存）
+            stock_info = self._cached('spot_raw', ak.stock_zh_a_spot_em, ttl=15)
+            stock_name_map = self._cached(
+                'spot_name_map',
+                lambda: dict(zip(stock_info['代码'].to_numpy(), stock_info['名称'].to_numpy())),
+                ttl=15)
             
             # 处理个股资金流向
             print("\n=== 处理个股资金流向 ===")
-            stock_flows_5000w = []  # 5000万以上
-            stock_flows_1000w = []  # 1000万-5000万
-            stock_flows_100w = []   # 100万-1000万
-            
-            for _, row in stock_flow.iterrows():
-                try:
-                    # 获取股票代码
-                    stock_code = row['代码'] if '代码' in row else None
-                    if not stock_code:
-                        print(f"找不到股票代码，行数据: {row}")
-                        continue
-                        
-                    stock_name = stock_name_map.get(stock_code, f"未知股票{stock_code}")
-                    
-                    # 获取主力净流入
-                    main_flow = 0
-                    for col in row.index:
-                        if '主力净流入' in col:
-                            try:
-                                value = str(row[col]).replace(',', '')
-                                if '亿' in value:
-                                    main_flow = float(value.replace('亿', '')) * 100000000
-                                elif '万' in value:
-                                    main_flow = float(value.replace('万', '')) * 10000
-                                else:
-                                    main_flow = float(value)
-                                break
-                            except:
-                                continue
-                    
-                    # 获取超大单净流入
-                    super_flow = 0
-                    for col in row.index:
-                        if '超大单净流入' in col:
-                            try:
-                                value = str(row[col]).replace(',', '')
-                                if '亿' in value:
-                                    super_flow = float(value.replace('亿', '')) * 100000000
-                                elif '万' in value:
-                                    super_flow = float(value.replace('万', '')) * 10000
-                                else:
-                                    super_flow = float(value)
-                                break
-                            except:
-                                continue
-                    
-                    # 获取大单净流入
-                    big_flow = 0
-                    for col in row.index:
-                        if '大单净流入' in col and '超' not in col:
-                            try:
-                                value = str(row[col]).replace(',', '')
-                                if '亿' in value:
-                                    big_flow = float(value.replace('亿', '')) * 100000000
-                                elif '万' in value:
-                                    big_flow = float(value.replace('万', '')) * 10000
-                                else:
-                                    big_flow = float(value)
-                                break
-                            except:
-                                continue
-                    
-                    # 获取中单净流入
-                    mid_flow = 0
-                    for col in row.index:
-                        if '中单净流入' in col:
-                            try:
-                                value = str(row[col]).replace(',', '')
-                                if '亿' in value:
-                                    mid_flow = float(value.replace('亿', '')) * 100000000
-                                elif '万' in value:
-                                    mid_flow = float(value.replace('万', '')) * 10000
-                                else:
-                                    mid_flow = float(value)
-                                break
-                            except:
-                                continue
-                    
-                    # 获取涨跌幅
-                    change_pct = 0
-                    for col in row.index:
-                        if '涨跌幅' in col:
-                            try:
-                                value = str(row[col]).replace('%', '')
-                                change_pct = float(value)
-                                break
-                            except:
-                                continue
-                    
-                    # 创建股票信息
-                    stock_info = {
-                        'code': stock_code,
-                        'name': stock_name,
-                        'change_pct': change_pct,
-                        'flow': main_flow,
-                        '超大单': super_flow,
-                        '大单': big_flow,
-                        '中单': mid_flow
+            if '代码' not in stock_flow.columns:
+                print(f"找不到股票代码列，现有列: {stock_flow.columns.tolist()}")
+                return None
+
+            # 按关键字把列名只解析一次，各资金列整列向量化转换
+            def find_col(key, exclude=None):
+                for c in stock_flow.columns:
+                    if key in c and (exclude is None or exclude not in c):
+                        return c
+                return None
+
+            main_col = find_col('主力净流入')
+            super_col = find_col('超大单净流入')
+            big_col = find_col('大单净流入', exclude='超')
+            mid_col = find_col('中单净流入')
+            change_col = find_col('涨跌幅')
+
+            codes = stock_flow['代码'].astype(str).to_numpy()
+            n = len(codes)
+            zeros = np.zeros(n)
+            main_flow = _parse_flow_series(stock_flow[main_col],
+                                           keep_nan=True) if main_col else zeros
+            super_flow = _parse_flow_series(stock_flow[super_col]) if super_col else zeros
+            big_flow = _parse_flow_series(stock_flow[big_col]) if big_col else zeros
+            mid_flow = _parse_flow_series(stock_flow[mid_col]) if mid_col else zeros
+            if change_col:
+                change_pct = pd.to_numeric(
+                    stock_flow[change_col].astype(str).str.rstrip('%'),
+                    errors='coerce').fillna(0.0).to_numpy(np.float64)
+            else:
+                change_pct = zeros
+
+            # 主力净流入解析失败的行整体剔除（相当于dropna），
+            # 分档在干净数组上进行，循环里不再需要逐行try/except兜底
+            valid = ~np.isnan(main_flow)
+            if not valid.all():
+                codes = codes[valid]
+                main_flow = main_flow[valid]
+                super_flow = super_flow[valid]
+                big_flow = big_flow[valid]
+                mid_flow = mid_flow[valid]
+                change_pct = change_pct[valid]
+
+            # 分档+档内降序统一交给_partition_flows，这里只负责
+            # 把下标翻成展示用的字典
+            buckets = [
+                [
+                    {
+                        'code': codes[i],
+                        'name': stock_name_map.get(codes[i], f"未知股票{codes[i]}"),
+                        'change_pct': change_pct[i],
+                        'flow': main_flow[i],
+                        '超大单': super_flow[i],
+                        '大单': big_flow[i],
+                        '中单': mid_flow[i]
                     }
-                    
-                    # 根据资金流向大小分类
-                    if abs(main_flow) >= 50000000:  # 5000万
-                        stock_flows_5000w.append(stock_info)
-                    elif abs(main_flow) >= 10000000:  # 1000万
-                        stock_flows_1000w.append(stock_info)
-                    elif abs(main_flow) >= 1000000:  # 100万
-                        stock_flows_100w.append(stock_info)
-                        
-                except Exception as e:
-                    print(f"处理行数据时出错: {e}")
-                    print(f"错误行数据: {row}")
-                    continue
-            
-            # 按资金流向绝对值排序
-            stock_flows_5000w.sort(key=lambda x: abs(x['flow']), reverse=True)
-            stock_flows_1000w.sort(key=lambda x: abs(x['flow']), reverse=True)
-            stock_flows_100w.sort(key=lambda x: abs(x['flow']), reverse=True)
-            
+                    for i in idx
+                ]
+                for idx in _partition_flows(np.abs(main_flow))
+            ]
+            stock_flows_5000w, stock_flows_1000w, stock_flows_100w = buckets
+
+
             return {
                 'stock_flows_5000w': stock_flows_5000w,
                 'stock_flows_1000w': stock_flows_1000w,
@@ -2284,11 +2713,21 @@ class StockScreener(QMainWindow):
             traceback.print_exc()
             return None
 
+    def _get_money_flow(self):
+        """资金流向分析结果的会话级缓存（30秒TTL），两个弹窗共用
+
+        分析失败返回None时不缓存，下次打开弹窗会重新分析。
+        """
+        result = self._cached('money_flow', self.analyze_money_flow, ttl=30)
+        if result is None:
+            self._fetch_cache.pop('money_flow', None)
+        return result
+
     def show_market_analysis(self):
         """显示市场分析结果"""
         try:
             # 获取资金流向分析
-            money_flow = self.analyze_money_flow()
+            money_flow = self._get_money_flow()
             if not money_flow:
                 return
             
@@ -2304,45 +2743,30 @@ class StockScreener(QMainWindow):
             flow_group = QGroupBox("个股资金流向分析")
             flow_layout = QVBoxLayout()
             
-            # 显示5000万以上个股
-            if money_flow['stock_flows_5000w']:
-                flow_layout.addWidget(QLabel("\n【资金流入5000万以上】"))
-                for stock in money_flow['stock_flows_5000w']:
-                    flow_text = f"{stock['name']}({stock['code']}) "
-                    flow_text += f"涨跌幅: {stock['change_pct']}%, "
-                    flow_text += f"主力净流入: {stock['flow']/100000000:.2f}亿, "
-                    flow_text += f"超大单: {stock['超大单']/100000000:.2f}亿, "
-                    flow_text += f"大单: {stock['大单']/100000000:.2f}亿, "
-                    flow_text += f"中单: {stock['中单']/100000000:.2f}亿, "
-                    flow_text += f"小单: {stock['小单']/100000000:.2f}亿"
-                    flow_layout.addWidget(QLabel(flow_text))
-            
-            # 显示1000万-5000万个股
-            if money_flow['stock_flows_1000w']:
-                flow_layout.addWidget(QLabel("\n【资金流入1000万-5000万】"))
-                for stock in money_flow['stock_flows_1000w']:
-                    flow_text = f"{stock['name']}({stock['code']}) "
-                    flow_text += f"涨跌幅: {stock['change_pct']}%, "
-                    flow_text += f"主力净流入: {stock['flow']/100000000:.2f}亿, "
-                    flow_text += f"超大单: {stock['超大单']/100000000:.2f}亿, "
-                    flow_text += f"大单: {stock['大单']/100000000:.2f}亿, "
-                    flow_text += f"中单: {stock['中单']/100000000:.2f}亿, "
-                    flow_text += f"小单: {stock['小单']/100000000:.2f}亿"
-                    flow_layout.addWidget(QLabel(flow_text))
-            
-            # 显示100万-1000万个股
-            if money_flow['stock_flows_100w']:
-                flow_layout.addWidget(QLabel("\n【资金流入100万-1000万】"))
-                for stock in money_flow['stock_flows_100w']:
-                    flow_text = f"{stock['name']}({stock['code']}) "
-                    flow_text += f"涨跌幅: {stock['change_pct']}%, "
-                    flow_text += f"主力净流入: {stock['flow']/100000000:.2f}亿, "
-                    flow_text += f"超大单: {stock['超大单']/100000000:.2f}亿, "
-                    flow_text += f"大单: {stock['大单']/100000000:.2f}亿, "
-                    flow_text += f"中单: {stock['中单']/100000000:.2f}亿, "
-                    flow_text += f"小单: {stock['小单']/100000000:.2f}亿"
-                    flow_layout.addWidget(QLabel(flow_text))
-            
+            # 全部行拼成一段HTML放进单个QTextBrowser，
+            # 不再给每只股票建一个QLabel（几百个控件会反复触发布局计算）
+            html = []
+            for title, stocks in (
+                ("资金流入5000万以上", money_flow['stock_flows_5000w']),
+                ("资金流入1000万-5000万", money_flow['stock_flows_1000w']),
+                ("资金流入100万-1000万", money_flow['stock_flows_100w']),
+            ):
+                if not stocks:
+                    continue
+                html.append(f"<h3>【{title}】</h3>")
+                for stock in stocks:
+                    html.append(
+                        f"<p>{stock['name']}({stock['code']}) "
+                        f"涨跌幅: {stock['change_pct']}%, "
+                        f"主力净流入: {stock['flow']/1e8:.2f}亿, "
+                        f"超大单: {stock['超大单']/1e8:.2f}亿, "
+                        f"大单: {stock['大单']/1e8:.2f}亿, "
+                        f"中单: {stock['中单']/1e8:.2f}亿</p>"
+                    )
+            browser = QTextBrowser()
+            browser.setHtml(''.join(html))
+            flow_layout.addWidget(browser)
+
             flow_group.setLayout(flow_layout)
             main_layout.addWidget(flow_group)
             
@@ -2358,7 +2782,7 @@ class StockScreener(QMainWindow):
     def show_money_flow_analysis(self):
         """显示资金流向分析结果"""
         try:
-            money_flow = self.analyze_money_flow()
+            money_flow = self._get_money_flow()
             if not money_flow:
                 return
             dialog = QDialog(self)
@@ -2374,11 +2798,11 @@ class StockScreener(QMainWindow):
             for i, stock in enumerate(all_data):
                 table.setItem(i, 0, QTableWidgetItem(stock['code']))
                 table.setItem(i, 1, QTableWidgetItem(stock['name']))
-                table.setItem(i, 2, NumericTableWidgetItem(str(stock['change_pct'])))
-                table.setItem(i, 3, NumericTableWidgetItem(str(stock['flow'])))
-                table.setItem(i, 4, NumericTableWidgetItem(str(stock['超大单'])))
-                table.setItem(i, 5, NumericTableWidgetItem(str(stock['大单'])))
-                table.setItem(i, 6, NumericTableWidgetItem(str(stock['中单'])))
+                table.setItem(i, 2, NumericTableWidgetItem(str(stock['change_pct']), stock['change_pct']))
+                table.setItem(i, 3, NumericTableWidgetItem(str(stock['flow']), stock['flow']))
+                table.setItem(i, 4, NumericTableWidgetItem(str(stock['超大单']), stock['超大单']))
+                table.setItem(i, 5, NumericTableWidgetItem(str(stock['大单']), stock['大单']))
+                table.setItem(i, 6, NumericTableWidgetItem(str(stock['中单']), stock['中单']))
             main_layout.addWidget(table)
             # 添加导出Excel按钮
             export_btn = QPushButton("导出Excel")
@@ -2397,7 +2821,6 @@ class StockScreener(QMainWindow):
     def show_money_flow_rank(self):
         """显示资金净流入排序"""
         try:
-            import akshare as ak
             rank_window = QDialog(self)
             rank_window.setWindowTitle("个股资金净流入排序")
             rank_window.setMinimumWidth(1400)
@@ -2413,13 +2836,17 @@ class StockScreener(QMainWindow):
             refresh_btn = QPushButton("刷新")
             export_btn = QPushButton("导出Excel")
             refresh_btn.clicked.connect(lambda: update_table(time_range_combo.currentText()))
-            
+
+            # 抓取期间的加载提示
+            status_label = QLabel("")
+
             # 创建水平布局来放置下拉框和按钮
             top_layout = QHBoxLayout()
             top_layout.addWidget(QLabel("时间范围:"))
             top_layout.addWidget(time_range_combo)
             top_layout.addWidget(refresh_btn)
             top_layout.addWidget(export_btn)
+            top_layout.addWidget(status_label)
             top_layout.addStretch()
             
             # 将顶部布局添加到主布局
@@ -2432,6 +2859,11 @@ class StockScreener(QMainWindow):
                 '股票代码', '股票名称', '最新价', '涨跌幅', 
                 '主力净流入(亿)', '超大单净流入(亿)', '大单净流入(亿)', '中单净流入(亿)', '总市值(亿)', '流通市值(亿)', '主力净流入占市值(%)', '主力净流入占流通市值(%)', '预期'
             ])
+            # 涨跌幅/资金/占比列的红绿色由绘制代理按数值决定，
+            # 填表循环不再逐格setForeground
+            color_delegate = FlowColorDelegate(flow_table)
+            for col in (3, 4, 5, 6, 7, 10, 11):
+                flow_table.setItemDelegateForColumn(col, color_delegate)
             layout.addWidget(flow_table)
             
             # 创建关闭按钮
@@ -2443,186 +2875,120 @@ class StockScreener(QMainWindow):
             rank_window.setLayout(layout)
             
             def update_table(time_range):
+                schema = _FLOW_SCHEMAS.get(time_range)
+                if schema is None:
+                    return
+                fetch_flow, column_map = schema
+                print(f"正在获取{time_range}资金流向数据...")
+                # 排行榜和全市场快照都在线程池里抓，期间事件循环照常跑，
+                # 抓完回到主线程再填表
+                status_label.setText("加载中…")
+                refresh_btn.setEnabled(False)
+                run_async(lambda: (fetch_flow(), _cached_ak('stock_zh_a_spot_em', 60)),
+                          lambda result: fill_table(result, column_map),
+                          on_fetch_error)
+
+            def on_fetch_error(msg):
+                status_label.setText("")
+                refresh_btn.setEnabled(True)
+                print(f"获取资金流向数据失败: {msg}")
+                QMessageBox.critical(rank_window, "错误", "获取资金流向数据失败，请稍后重试")
+
+            def fill_table(result, column_map):
+                status_label.setText("")
+                refresh_btn.setEnabled(True)
                 try:
-                    print(f"正在获取{time_range}资金流向数据...")
-                    if time_range == "当日":
-                        flow_data = ak.stock_fund_flow_individual()
-                        column_map = {
-                            'code': '股票代码',
-                            'name': '股票简称',
-                            'price': '最新价',
-                            'change_percent': '涨跌幅',
-                            'main_net_inflow': '净额',
-                            'super_net_inflow': '流入资金',
-                            'big_net_inflow': '流出资金',
-                            'medium_net_inflow': '成交额'
-                        }
-                    elif time_range == "5日":
-                        flow_data = ak.stock_individual_fund_flow_rank()
-                        column_map = {
-                            'code': '代码',
-                            'name': '名称',
-                            'price': '最新价',
-                            'change_percent': '5日涨跌幅',
-                            'main_net_inflow': '5日主力净流入-净额',
-                            'super_net_inflow': '5日超大单净流入-净额',
-                            'big_net_inflow': '5日大单净流入-净额',
-                            'medium_net_inflow': '5日中单净流入-净额'
-                        }
-                    elif time_range == "东方财富当日":
-                        flow_data = ak.stock_individual_fund_flow_rank(indicator="今日")
-                        # 字段适配
-                        column_map = {
-                            'code': '代码',
-                            'name': '名称',
-                            'price': '最新价',
-                            'change_percent': '今日涨跌幅',
-                            'main_net_inflow': '今日主力净流入-净额',
-                            'super_net_inflow': '今日超大单净流入-净额',
-                            'big_net_inflow': '今日大单净流入-净额',
-                            'medium_net_inflow': '今日中单净流入-净额'
-                        }
-                    else:
-                        return
+                    flow_data, spot_df = result
                     print(f"数据形状: {flow_data.shape}")
                     print(f"数据列名: {flow_data.columns.tolist()}")
-                    # 获取全市场总市值数据
-                    spot_df = ak.stock_zh_a_spot_em()
                     code2cap = dict(zip(spot_df['代码'], spot_df['总市值']))
                     code2liucap = dict(zip(spot_df['代码'], spot_df['流通市值']))
-                    sorted_data = []
-                    flow_table.setRowCount(len(flow_data))
-                    for i, row in flow_data.iterrows():
-                        try:
-                            code = str(row[column_map['code']])
-                            name = str(row[column_map['name']])
-                            price = str(row[column_map['price']])
-                            change = str(row[column_map['change_percent']]).rstrip('%') + '%'
-                            flow_table.setItem(i, 0, QTableWidgetItem(code))
-                            flow_table.setItem(i, 1, QTableWidgetItem(name))
-                            flow_table.setItem(i, 2, NumericTableWidgetItem(price))
-                            flow_table.setItem(i, 3, NumericTableWidgetItem(change))
-                            def convert_flow_value(value):
-                                try:
-                                    if isinstance(value, str):
-                                        value = value.replace(',', '')
-                                        if '亿' in value:
-                                            return float(value.replace('亿', ''))
-                                        elif '万' in value:
-                                            return float(value.replace('万', '')) / 10000
-                                        else:
-                                            return float(value) / 100000000
-                                    else:
-                                        return float(value) / 100000000
-                                except:
-                                    return 0.0
-                            flow_columns = [
-                                column_map['main_net_inflow'],
-                                column_map['super_net_inflow'],
-                                column_map['big_net_inflow'],
-                                column_map['medium_net_inflow']
-                            ]
-                            flow_values = []
-                            for column_name in flow_columns:
-                                value = convert_flow_value(row[column_name])
-                                flow_values.append(value)
-                            sorted_data.append({
-                                'code': code,
-                                'name': name,
-                                'price': price,
-                                'change': change,
-                                'flows': flow_values,
-                                'main_flow': flow_values[0]
-                            })
-                            for col, value in enumerate(flow_values, start=4):
-                                item = NumericTableWidgetItem(f"{value:.2f}")
-                                if value > 0:
-                                    item.setForeground(QBrush(QColor('#FF4444')))
-                                else:
-                                    item.setForeground(QBrush(QColor('#00AA00')))
-                                flow_table.setItem(i, col, item)
-                            # 计算主力净流入占总市值比例
-                            cap = code2cap.get(code, 0)
-                            liucap = code2liucap.get(code, 0)
-                            try:
-                                cap = float(cap)
-                            except:
-                                cap = 0
-                            try:
-                                liucap = float(liucap)
-                            except:
-                                liucap = 0
-                            main_flow = flow_values[0] * 1e8  # 单位元
-                            # 总市值(亿)
-                            cap_yi = cap / 1e8 if cap > 0 else 0
-                            cap_item = NumericTableWidgetItem(f"{cap_yi:.2f}")
-                            flow_table.setItem(i, 8, cap_item)
-                            # 流通市值(亿)
-                            liucap_yi = liucap / 1e8 if liucap > 0 else 0
-                            liucap_item = NumericTableWidgetItem(f"{liucap_yi:.2f}")
-                            flow_table.setItem(i, 9, liucap_item)
-                            # 主力净流入占总市值比例
-                            ratio = (main_flow / cap * 100) if cap > 0 else 0
-                            ratio_item = NumericTableWidgetItem(f"{ratio:.2f}")
-                            if ratio > 0:
-                                ratio_item.setForeground(QBrush(QColor('#FF4444')))
-                            else:
-                                ratio_item.setForeground(QBrush(QColor('#00AA00')))
-                            flow_table.setItem(i, 10, ratio_item)
-                            # 主力净流入占流通市值比例
-                            liuratio = (main_flow / liucap * 100) if liucap > 0 else 0
-                            liuratio_item = NumericTableWidgetItem(f"{liuratio:.2f}")
-                            if liuratio > 0:
-                                liuratio_item.setForeground(QBrush(QColor('#FF4444')))
-                            else:
-                                liuratio_item.setForeground(QBrush(QColor('#00AA00')))
-                            flow_table.setItem(i, 11, liuratio_item)
-                            # 预期判断
-                            # 规则：
-                            # 1. 总市值大于500亿且主力净流入占比<0.1%，预期"主力流入占比低，大盘股难大涨"
-                            # 2. 总市值小于50亿且主力净流入占比>0.5%，预期"主力流入占比高，小盘股易拉升"
-                            # 3. 主力净流入占流通市值>1%，预期"主力流入占流通盘高，极易拉升"
-                            # 4. 其余"中性"
-                            if cap_yi > 500 and ratio < 0.1:
-                                expect = "主力流入占比低，大盘股难大涨"
-                            elif cap_yi < 50 and ratio > 0.5:
-                                expect = "主力流入占比高，小盘股易拉升"
-                            elif liuratio > 1:
-                                expect = "主力流入占流通盘高，极易拉升"
-                            elif ratio > 0.3:
-                                expect = "主力流入占比高，短线关注"
-                            else:
-                                expect = "中性"
-                            expect_item = QTableWidgetItem(expect)
-                            flow_table.setItem(i, 12, expect_item)
+                    # 四个资金列整列向量化解析并换算成亿，循环内只按行取数
+                    flow_columns = [
+                        column_map['main_net_inflow'],
+                        column_map['super_net_inflow'],
+                        column_map['big_net_inflow'],
+                        column_map['medium_net_inflow']
+                    ]
+                    flow_cols_yi = [_parse_flow_series(flow_data[c]) / 100000000
+                                    for c in flow_columns]
+                    # 标量列、市值和占比全部整列向量化算好，
+                    # 行循环里只剩建item和着色
+                    codes = flow_data[column_map['code']].astype(str)
+                    names = flow_data[column_map['name']].astype(str).to_numpy()
+                    prices = flow_data[column_map['price']].astype(str).to_numpy()
+                    change_strs = flow_data[column_map['change_percent']].astype(str).str.rstrip('%')
+                    change_vals = pd.to_numeric(change_strs, errors='coerce').fillna(0.0).to_numpy(np.float64)
+                    change_strs = (change_strs + '%').to_numpy()
+                    caps = pd.to_numeric(codes.map(code2cap),
+                                         errors='coerce').fillna(0.0).to_numpy(np.float64)
+                    liucaps = pd.to_numeric(codes.map(code2liucap),
+                                            errors='coerce').fillna(0.0).to_numpy(np.float64)
+                    codes = codes.to_numpy()
+                    main_flows = flow_cols_yi[0] * 1e8  # 单位元
+                    caps_yi = np.where(caps > 0, caps / 1e8, 0.0)
+                    liucaps_yi = np.where(liucaps > 0, liucaps / 1e8, 0.0)
+                    # 主力净流入占总市值/流通市值比例，市值为0的行占比记0
+                    ratios = np.divide(main_flows * 100, caps,
+                                       out=np.zeros_like(main_flows),
+                                       where=caps > 0)
+                    liuratios = np.divide(main_flows * 100, liucaps,
+                                          out=np.zeros_like(main_flows),
+                                          where=liucaps > 0)
+                    # 预期判断
+                    # 规则：
+                    # 1. 总市值大于500亿且主力净流入占比<0.1%，预期"主力流入占比低，大盘股难大涨"
+                    # 2. 总市值小于50亿且主力净流入占比>0.5%，预期"主力流入占比高，小盘股易拉升"
+                    # 3. 主力净流入占流通市值>1%，预期"主力流入占流通盘高，极易拉升"
+                    # 4. 其余"中性"
+                    expects = np.select(
+                        [
+                            (caps_yi > 500) & (ratios < 0.1),
+                            (caps_yi < 50) & (ratios > 0.5),
+                            liuratios > 1,
+                            ratios > 0.3,
+                        ],
+                        [
+                            "主力流入占比低，大盘股难大涨",
+                            "主力流入占比高，小盘股易拉升",
+                            "主力流入占流通盘高，极易拉升",
+                            "主力流入占比高，短线关注",
+                        ],
+                        default="中性")
+                    # 批量填充期间关掉排序/重绘/信号（刷新时排序可能还开着），
+                    # 避免每个setItem都触发重排序和重绘；出错也要恢复，
+                    # 否则表格会一直停在不重绘的状态
+                    flow_table.setSortingEnabled(False)
+                    flow_table.setUpdatesEnabled(False)
+                    flow_table.blockSignals(True)
+                    try:
+                        flow_table.setRowCount(len(flow_data))
+                        for i in range(len(flow_data)):
                             try:
-                                change_item = flow_table.item(i, 3)
-                                change_text = change_item.text().replace('%', '')
-                                change_value = float(change_text)
-                                if change_value > 0:
-                                    change_item.setForeground(QBrush(QColor('#FF4444')))
-                                elif change_value < 0:
-                                    change_item.setForeground(QBrush(QColor('#00AA00')))
+                                flow_table.setItem(i, 0, QTableWidgetItem(codes[i]))
+                                flow_table.setItem(i, 1, QTableWidgetItem(names[i]))
+                                flow_table.setItem(i, 2, NumericTableWidgetItem(prices[i]))
+                                flow_table.setItem(i, 3, NumericTableWidgetItem(change_strs[i], change_vals[i]))
+                                for col, arr in enumerate(flow_cols_yi, start=4):
+                                    value = arr[i]
+                                    flow_table.setItem(i, col, NumericTableWidgetItem(f"{value:.2f}", value))
+                                flow_table.setItem(i, 8, NumericTableWidgetItem(f"{caps_yi[i]:.2f}", caps_yi[i]))
+                                flow_table.setItem(i, 9, NumericTableWidgetItem(f"{liucaps_yi[i]:.2f}", liucaps_yi[i]))
+                                flow_table.setItem(i, 10, NumericTableWidgetItem(f"{ratios[i]:.2f}", ratios[i]))
+                                flow_table.setItem(i, 11, NumericTableWidgetItem(f"{liuratios[i]:.2f}", liuratios[i]))
+                                flow_table.setItem(i, 12, QTableWidgetItem(expects[i]))
                             except Exception as e:
-                                print(f"设置涨跌幅颜色失败: {e}")
-                        except Exception as e:
-                            print(f"处理第 {i+1} 条数据失败: {e}")
-                            continue
-                    sorted_data.sort(key=lambda x: x['main_flow'], reverse=True)
-                    for data in sorted_data:
-                        flow_str = " ".join([f"{flow:>12.2f}" for flow in data['flows']])
-                        print("{:<10} {:<12} {:<8} {:<8} {}".format(
-                            data['code'],
-                            data['name'],
-                            data['price'],
-                            data['change'],
-                            flow_str
-                        ))
-                    flow_table.setSortingEnabled(True)
+                                print(f"处理第 {i+1} 条数据失败: {e}")
+                                continue
+                    finally:
+                        flow_table.blockSignals(False)
+                        flow_table.setUpdatesEnabled(True)
+                        flow_table.setSortingEnabled(True)
+                    print(f"资金流向表格填充完成，共{len(flow_data)}行")
                     flow_table.resizeColumnsToContents()
                     flow_table.setAlternatingRowColors(True)
                 except Exception as e:
-                    print(f"获取资金流向数据失败: {e}")
+                    print(f"填充资金流向表格失败: {e}")
                     QMessageBox.critical(rank_window, "错误", "获取资金流向数据失败，请稍后重试")
             
             # 连接信号
@@ -2669,31 +3035,41 @@ class StockScreener(QMainWindow):
             
             if not file_name:
                 return
-                
-            # 获取表格数据
-            data = []
-            headers = []
-            
+
+            row_count = table.rowCount()
+            col_count = table.columnCount()
+
             # 获取表头
-            for col in range(table.columnCount()):
-                headers.append(table.horizontalHeaderItem(col).text())
-            
-            # 获取数据
-            for row in range(table.rowCount()):
-                row_data = []
-                for col in range(table.columnCount()):
-                    item = table.item(row, col)
-                    if item is not None:
-                        row_data.append(item.text())
-                    else:
-                        row_data.append("")
-                data.append(row_data)
-            
-            # 创建DataFrame
-            df = pd.DataFrame(data, columns=headers)
-            
-            # 保存为Excel
-            df.to_excel(file_name, index=False)
+            headers = [table.horizontalHeaderItem(col).text()
+                       for col in range(col_count)]
+
+            try:
+                import xlsxwriter
+            except ImportError:
+                xlsxwriter = None
+
+            def row_texts(row):
+                # table.item每格只查一次，空格写空串
+                return [item.text() if (item := table.item(row, col)) is not None
+                        else "" for col in range(col_count)]
+
+            if xlsxwriter is not None:
+                # constant_memory模式逐行写盘，不用先把整张表攒进
+                # Python列表再建DataFrame（大表时省掉两份中间拷贝）
+                workbook = xlsxwriter.Workbook(file_name,
+                                               {'constant_memory': True})
+                worksheet = workbook.add_worksheet()
+                worksheet.write_row(0, 0, headers)
+                for row in range(row_count):
+                    worksheet.write_row(row + 1, 0, row_texts(row))
+                workbook.close()
+            else:
+                # 没装xlsxwriter时退回DataFrame导出；装了时上面的流式路径
+                # 等价于to_excel(engine='xlsxwriter')且不攒整表，
+                # 所以这个分支只能走pandas默认引擎
+                data = [row_texts(row) for row in range(row_count)]
+                df = pd.DataFrame(data, columns=headers)
+                df.to_excel(file_name, index=False)
             
             QMessageBox.information(self, "成功", "数据已成功导出到Excel文件！")
             
@@ -2702,8 +3078,6 @@ class StockScreener(QMainWindow):
 
     def show_main_fund_rank(self):
         """显示主力排名表格"""
-        import akshare as ak
-        import pandas as pd
         try:
             dialog = QDialog(self)
             dialog.setWindowTitle("主力排名")
@@ -2721,10 +3095,14 @@ class StockScreener(QMainWindow):
             
             # 创建导出按钮
             export_btn = QPushButton("导出Excel")
-            
+
+            # 抓取期间的加载提示
+            status_label = QLabel("")
+
             # 添加按钮到顶部布局
             top_layout.addWidget(refresh_btn)
             top_layout.addWidget(export_btn)
+            top_layout.addWidget(status_label)
             top_layout.addStretch()
             
             # 将顶部布局添加到主布局
@@ -2735,49 +3113,78 @@ class StockScreener(QMainWindow):
             layout.addWidget(table)
             
             def update_table():
+                # 抓取放到线程池里做，完成后回主线程填表，弹窗不再卡顿
+                status_label.setText("加载中…")
+                refresh_btn.setEnabled(False)
+                run_async(lambda: _cached_ak('stock_main_fund_flow', 60),
+                          fill_table, on_fetch_error)
+
+            def on_fetch_error(msg):
+                status_label.setText("")
+                refresh_btn.setEnabled(True)
+                print(f"获取主力排名数据失败: {msg}")
+                QMessageBox.critical(dialog, "错误", "获取主力排名数据失败，请稍后重试")
+
+            def fill_table(df):
+                status_label.setText("")
+                refresh_btn.setEnabled(True)
                 try:
-                    # 获取数据
-                    df = ak.stock_main_fund_flow()
-                    
                     # 设置表格
                     columns = df.columns.tolist()
-                    table.setColumnCount(len(columns))
-                    table.setHorizontalHeaderLabels(columns)
-                    table.setRowCount(len(df))
-                    
-                    # 填充数据
-                    for i, row in df.iterrows():
-                        for j, col in enumerate(columns):
-                            #NumericTableWidgetItem QTableWidgetItem
-                            item = NumericTableWidgetItem(str(row[col]))
-                            item.setTextAlignment(Qt.AlignCenter)
-                            
-                            # 设置涨跌幅颜色
-                            if '涨跌幅' in col or '涨跌幅(%)' in col:
-                                try:
-                                    value = float(str(row[col]).replace('%', ''))
-                                    if value > 0:
-                                        item.setForeground(QBrush(QColor('#FF4444')))
-                                    elif value < 0:
-                                        item.setForeground(QBrush(QColor('#00AA00')))
-                                except:
-                                    pass
-                            
-                            # 设置资金流向颜色
-                            if '净额' in col or '净流入' in col:
-                                try:
-                                    value = float(str(row[col]).replace(',', ''))
-                                    if value > 0:
-                                        item.setForeground(QBrush(QColor('#FF4444')))
-                                    elif value < 0:
-                                        item.setForeground(QBrush(QColor('#00AA00')))
-                                except:
-                                    pass
-                            
-                            table.setItem(i, j, item)
-                    
+                    # 整列一次转成字符串数组，着色列的下标也只判定一次，
+                    # 单元格循环里不再做iterrows装箱和列名子串扫描
+                    arrays = [df[c].astype(str).to_numpy() for c in columns]
+                    color_chg = {j for j, c in enumerate(columns) if '涨跌幅' in c}
+                    color_flow = {j for j, c in enumerate(columns)
+                                  if '净额' in c or '净流入' in c}
+
+                    # 批量填充期间关掉排序/重绘/信号，填完一次性恢复；
+                    # 出错也要恢复，否则表格会一直停在不重绘的状态
+                    table.setSortingEnabled(False)
+                    table.setUpdatesEnabled(False)
+                    table.blockSignals(True)
+                    try:
+                        table.setColumnCount(len(columns))
+                        table.setHorizontalHeaderLabels(columns)
+                        table.setRowCount(len(df))
+
+                        # 填充数据
+                        for i in range(len(df)):
+                            for j, arr in enumerate(arrays):
+                                text = arr[i]
+                                #NumericTableWidgetItem QTableWidgetItem
+                                item = NumericTableWidgetItem(text)
+                                item.setTextAlignment(Qt.AlignCenter)
+
+                                # 设置涨跌幅颜色
+                                if j in color_chg:
+                                    try:
+                                        value = float(text.replace('%', ''))
+                                        if value > 0:
+                                            item.setForeground(BRUSH_RED)
+                                        elif value < 0:
+                                            item.setForeground(BRUSH_GREEN)
+                                    except:
+                                        pass
+
+                                # 设置资金流向颜色
+                                if j in color_flow:
+                                    try:
+                                        value = float(text.replace(',', ''))
+                                        if value > 0:
+                                            item.setForeground(BRUSH_RED)
+                                        elif value < 0:
+                                            item.setForeground(BRUSH_GREEN)
+                                    except:
+                                        pass
+
+                                table.setItem(i, j, item)
+                    finally:
+                        table.blockSignals(False)
+                        table.setUpdatesEnabled(True)
+                        table.setSortingEnabled(True)
+
                     # 设置表格属性
-                    table.setSortingEnabled(True)
                     table.resizeColumnsToContents()
                     table.setAlternatingRowColors(True)
                     